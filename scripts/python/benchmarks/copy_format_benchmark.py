@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import polars as pl
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_generator import build_dataframe  # noqa: E402
+from etl_processor import COPY_FORMATS, build_copy_frame, copy_to_staging, transform_chunk  # noqa: E402
+
+
+def backend_cpu_seconds(backend_pid: int) -> float | None:
+    stat_path = Path(f"/proc/{backend_pid}/stat")
+    try:
+        fields = stat_path.read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+
+    ticks = int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf("SC_CLK_TCK")
+
+
+def benchmark_format(connection_string: str, frames: list, copy_format: str) -> dict:
+    process_id = str(uuid.uuid4())
+    frames = [frame.with_columns(pl.lit(process_id).alias("process_id")) for frame in frames]
+
+    with psycopg.connect(connection_string, autocommit=False) as conn:
+        backend_pid = conn.info.backend_pid
+        server_before = backend_cpu_seconds(backend_pid)
+        client_before = time.process_time()
+        started = time.perf_counter()
+
+        for frame in frames:
+            copy_to_staging(conn, frame, copy_format)
+            conn.commit()
+
+        elapsed = time.perf_counter() - started
+        client_cpu = time.process_time() - client_before
+        server_after = backend_cpu_seconds(backend_pid)
+
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM staging_transactions WHERE process_id = %s", (process_id,))
+        conn.commit()
+
+    rows = sum(frame.height for frame in frames)
+    server_cpu = None if server_before is None or server_after is None else server_after - server_before
+    return {
+        "format": copy_format,
+        "rows": rows,
+        "elapsedSeconds": round(elapsed, 3),
+        "rowsPerSecond": round(rows / elapsed) if elapsed else None,
+        "clientCpuSeconds": round(client_cpu, 3),
+        "serverCpuSeconds": None if server_cpu is None else round(server_cpu, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara COPY CSV vs COPY BINARY hacia staging_transactions")
+    parser.add_argument("--connection-string", required=True, help="Cadena de conexión de PostgreSQL")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Número de filas a generar")
+    parser.add_argument("--chunk-size", type=int, default=200000, help="Tamaño de bloque por COPY")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por formato")
+    args = parser.parse_args()
+
+    transformed = transform_chunk(build_dataframe(args.rows))
+    copy_frame = build_copy_frame(transformed, str(uuid.uuid4()), "0" * 64, "Benchmark")
+    frames = [copy_frame.slice(offset, args.chunk_size) for offset in range(0, copy_frame.height, args.chunk_size)]
+
+    results = [
+        benchmark_format(args.connection_string, frames, copy_format)
+        for _ in range(args.repeat)
+        for copy_format in COPY_FORMATS
+    ]
+    print(json.dumps({"rows": args.rows, "chunkSize": args.chunk_size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
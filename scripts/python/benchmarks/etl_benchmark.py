@@ -0,0 +1,281 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_generator import build_dataframe  # noqa: E402
+from etl_processor import (  # noqa: E402
+    COPY_FORMATS,
+    build_copy_frame,
+    copy_to_staging,
+    iter_chunks,
+    scan_input_file,
+    transform_chunk,
+)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+STAGES = ["scan", "transform_chunk", "build_copy_frame", "copy_to_staging", "merge"]
+DATABASE_STAGES = {"copy_to_staging", "merge"}
+INPUT_FORMATS = ["parquet", "csv"]
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[3] / ".cache" / "benchmarks"
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def ensure_dataset(data_dir: Path, rows: int, input_format: str) -> Path:
+    path = data_dir / f"transactions_{rows}.{input_format}"
+    if path.exists():
+        return path
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    df = build_dataframe(rows)
+    if input_format == "parquet":
+        df.write_parquet(path)
+    else:
+        df.write_csv(path)
+    return path
+
+
+def read_chunks(path: Path, chunk_size: int) -> list:
+    return list(iter_chunks(scan_input_file(path), chunk_size))
+
+
+def transformed_chunks(path: Path, chunk_size: int) -> list:
+    chunks = []
+    offset = 0
+    for chunk in iter_chunks(scan_input_file(path), chunk_size):
+        chunks.append(transform_chunk(chunk, offset))
+        offset += chunk.height
+    return chunks
+
+
+def copy_frames(path: Path, chunk_size: int, process_id: str, source_system: str) -> list:
+    return [
+        build_copy_frame(chunk, process_id, "0" * 64, source_system)
+        for chunk in transformed_chunks(path, chunk_size)
+    ]
+
+
+def load_staging(conn: psycopg.Connection, frames: list, copy_format: str) -> None:
+    for frame in frames:
+        copy_to_staging(conn, frame, copy_format)
+        conn.commit()
+
+
+def cleanup(conn: psycopg.Connection, process_id: str, source_system: str) -> None:
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM staging_transactions WHERE process_id = %s", (process_id,))
+        cursor.execute("DELETE FROM transactions WHERE source_system = %s", (source_system,))
+    conn.commit()
+
+
+def merge_partition(connection_string: str, process_id: str, partition: int, partition_count: int) -> tuple[int, int]:
+    with psycopg.connect(connection_string, autocommit=False) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM merge_staging_to_transactions_partition(%s, %s, %s)",
+                (process_id, partition, partition_count),
+            )
+            result = cursor.fetchone()
+        conn.commit()
+    return result
+
+
+def merge_staging(conn: psycopg.Connection, connection_string: str, process_id: str, merge_partitions: int) -> tuple[int, int]:
+    if merge_partitions <= 1:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM merge_staging_to_transactions(%s)", (process_id,))
+            result = cursor.fetchone()
+        conn.commit()
+        return result
+
+    with ThreadPoolExecutor(max_workers=merge_partitions) as executor:
+        results = list(executor.map(
+            lambda partition: merge_partition(connection_string, process_id, partition, merge_partitions),
+            range(merge_partitions),
+        ))
+    return sum(inserted for inserted, _ in results), sum(updated for _, updated in results)
+
+
+def run_stage(
+    stage: str,
+    path: str,
+    chunk_size: int,
+    connection_string: str | None,
+    copy_format: str,
+    merge_partitions: int = 1,
+) -> dict:
+    input_path = Path(path)
+    process_id = str(uuid.uuid4())
+    source_system = f"Benchmark-{process_id[:8]}"
+    rows = 0
+
+    # Cada etapa corre en un proceso nuevo: la preparación de su entrada no se cronometra,
+    # y inputRssMb permite separar la memoria de la entrada del pico propio de la etapa.
+    if stage == "scan":
+        input_rss = peak_rss_mb()
+        started = time.perf_counter()
+        for chunk in iter_chunks(scan_input_file(input_path), chunk_size):
+            rows += chunk.height
+        elapsed = time.perf_counter() - started
+
+    elif stage == "transform_chunk":
+        chunks = read_chunks(input_path, chunk_size)
+        input_rss = peak_rss_mb()
+        offset = 0
+        started = time.perf_counter()
+        for chunk in chunks:
+            rows += transform_chunk(chunk, offset).height
+            offset += chunk.height
+        elapsed = time.perf_counter() - started
+
+    elif stage == "build_copy_frame":
+        chunks = transformed_chunks(input_path, chunk_size)
+        input_rss = peak_rss_mb()
+        started = time.perf_counter()
+        for chunk in chunks:
+            rows += build_copy_frame(chunk, process_id, "0" * 64, source_system).height
+        elapsed = time.perf_counter() - started
+
+    elif stage == "copy_to_staging":
+        frames = copy_frames(input_path, chunk_size, process_id, source_system)
+        rows = sum(frame.height for frame in frames)
+        input_rss = peak_rss_mb()
+        with psycopg.connect(connection_string, autocommit=False) as conn:
+            try:
+                started = time.perf_counter()
+                load_staging(conn, frames, copy_format)
+                elapsed = time.perf_counter() - started
+            finally:
+                cleanup(conn, process_id, source_system)
+
+    elif stage == "merge":
+        frames = copy_frames(input_path, chunk_size, process_id, source_system)
+        with psycopg.connect(connection_string, autocommit=False) as conn:
+            try:
+                load_staging(conn, frames, copy_format)
+                del frames
+                input_rss = peak_rss_mb()
+                started = time.perf_counter()
+                inserted, updated = merge_staging(conn, connection_string, process_id, merge_partitions)
+                elapsed = time.perf_counter() - started
+                rows = inserted + updated
+            finally:
+                cleanup(conn, process_id, source_system)
+
+    else:
+        raise ValueError(f"Etapa desconocida: {stage}")
+
+    return {
+        "stage": stage,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rowsPerSecond": round(rows / elapsed) if elapsed else None,
+        "inputRssMb": input_rss,
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def run_isolated(
+    stage: str,
+    path: Path,
+    chunk_size: int,
+    connection_string: str | None,
+    copy_format: str,
+    merge_partitions: int,
+) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(
+            run_stage, stage, str(path), chunk_size, connection_string, copy_format, merge_partitions
+        ).result()
+
+
+def parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark por etapa del ETL sobre datasets sintéticos")
+    parser.add_argument("--connection-string", default="", help="Cadena de conexión de PostgreSQL (sin ella se omiten COPY y merge)")
+    parser.add_argument("--rows", default="100000,1000000,5000000", help="Tamaños de dataset separados por coma")
+    parser.add_argument("--formats", default="parquet,csv", help="Formatos de entrada separados por coma")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Etapas a medir separadas por coma")
+    parser.add_argument("--chunk-size", type=int, default=200000, help="Tamaño de bloque para procesar")
+    parser.add_argument("--copy-format", choices=COPY_FORMATS, default="csv", help="Formato de COPY hacia staging")
+    parser.add_argument("--merge-partitions", type=int, default=1, help="Particiones de merge concurrentes (1 = merge único)")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Directorio donde se generan y reutilizan los datasets")
+    parser.add_argument("--output", default="", help="Archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in parse_list(args.rows)]
+    input_formats = parse_list(args.formats)
+    stages = parse_list(args.stages)
+
+    unknown = sorted(set(input_formats) - set(INPUT_FORMATS)) + sorted(set(stages) - set(STAGES))
+    if unknown:
+        raise ValueError(f"Valores no soportados: {', '.join(unknown)}")
+
+    if not args.connection_string:
+        skipped = [stage for stage in stages if stage in DATABASE_STAGES]
+        if skipped:
+            print(f"Sin --connection-string; se omiten: {', '.join(skipped)}", file=sys.stderr)
+        stages = [stage for stage in stages if stage not in DATABASE_STAGES]
+
+    results = []
+    for rows in sizes:
+        for input_format in input_formats:
+            path = ensure_dataset(Path(args.data_dir), rows, input_format)
+            for stage in stages:
+                result = run_isolated(
+                    stage,
+                    path,
+                    args.chunk_size,
+                    args.connection_string or None,
+                    args.copy_format,
+                    args.merge_partitions,
+                )
+                results.append({"dataset": path.name, "format": input_format, **result})
+                print(
+                    f"{path.name} {stage}: {result['seconds']}s, {result['rowsPerSecond']} filas/s, "
+                    f"pico RSS {result['peakRssMb']} MB",
+                    file=sys.stderr,
+                )
+
+    report = json.dumps(
+        {
+            "chunkSize": args.chunk_size,
+            "copyFormat": args.copy_format,
+            "mergePartitions": args.merge_partitions,
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(report, encoding="utf-8")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
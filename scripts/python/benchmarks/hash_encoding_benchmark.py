@@ -0,0 +1,168 @@
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+
+import psycopg
+from psycopg import sql
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_generator import iter_batches  # noqa: E402
+from etl_processor import (  # noqa: E402
+    COPY_FORMATS,
+    build_copy_frame,
+    copy_payload,
+    serialize_copy_frame,
+    session_time_zone,
+    transform_chunk,
+)
+from hash_encoding import HASH_ENCODINGS  # noqa: E402
+
+SQL_DIR = Path(__file__).resolve().parents[2] / "sql"
+SCHEMA_SCRIPTS = {
+    "hex": ["001_schema.sql", "002_merge_staging_to_prod.sql"],
+    "raw": ["001_schema.sql", "002_merge_staging_to_prod.sql", "007_hash_bytea.sql"],
+}
+SIZE_SQL = """
+    SELECT
+        pg_relation_size('ux_transactions_transaction'),
+        pg_relation_size('transactions'),
+        pg_total_relation_size('transactions')
+"""
+
+
+def create_schema(conn: psycopg.Connection, schema: str, hash_encoding: str) -> None:
+    # Cada codificación usa su propio esquema con el DDL del repositorio; las funciones y
+    # el ETL resuelven las tablas por search_path.
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(schema)))
+        cursor.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+        cursor.execute(sql.SQL("SET search_path TO {}, public").format(sql.Identifier(schema)))
+        for script in SCHEMA_SCRIPTS[hash_encoding]:
+            cursor.execute((SQL_DIR / script).read_text(encoding="utf-8"))
+    conn.commit()
+
+
+def load_staging(
+    conn: psycopg.Connection,
+    rows: int,
+    chunk_size: int,
+    process_id: str,
+    hash_encoding: str,
+    copy_format: str,
+    now: datetime,
+) -> tuple[float, int]:
+    time_zone = session_time_zone(conn)
+    copy_seconds = 0.0
+    copy_bytes = 0
+    row_offset = 0
+
+    for batch in iter_batches(rows, chunk_size, seed=42, now=now):
+        frame = build_copy_frame(transform_chunk(batch, row_offset), process_id, "0" * 64, "Benchmark", hash_encoding)
+        row_offset += batch.height
+        with serialize_copy_frame(frame, copy_format, time_zone) as payload:
+            started = time.perf_counter()
+            copy_payload(conn, payload, copy_format)
+            conn.commit()
+            copy_seconds += time.perf_counter() - started
+            copy_bytes += len(payload)
+
+    return copy_seconds, copy_bytes
+
+
+def merge(conn: psycopg.Connection, process_id: str) -> tuple[float, int, int]:
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM merge_staging_to_transactions(%s)", (process_id,))
+        inserted, updated = cursor.fetchone()
+    conn.commit()
+    return time.perf_counter() - started, inserted, updated
+
+
+def benchmark_encoding(
+    connection_string: str,
+    rows: int,
+    chunk_size: int,
+    hash_encoding: str,
+    copy_format: str,
+    keep: bool,
+) -> dict:
+    schema = f"bench_hash_{hash_encoding}"
+    now = datetime.now(UTC)
+
+    with psycopg.connect(connection_string, autocommit=False) as conn:
+        create_schema(conn, schema, hash_encoding)
+        try:
+            process_id = str(uuid.uuid4())
+            copy_seconds, copy_bytes = load_staging(conn, rows, chunk_size, process_id, hash_encoding, copy_format, now)
+            insert_seconds, inserted, _ = merge(conn, process_id)
+
+            with conn.cursor() as cursor:
+                cursor.execute(SIZE_SQL)
+                index_bytes, heap_bytes, total_bytes = cursor.fetchone()
+            conn.commit()
+
+            # Segunda carga del mismo archivo: todas las filas chocan y solo se compara payload_hash.
+            process_id = str(uuid.uuid4())
+            load_staging(conn, rows, chunk_size, process_id, hash_encoding, copy_format, now)
+            conflict_seconds, _, updated = merge(conn, process_id)
+        finally:
+            if not keep:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(schema)))
+                conn.commit()
+
+    return {
+        "hashEncoding": hash_encoding,
+        "rowsInserted": inserted,
+        "copySeconds": round(copy_seconds, 3),
+        "copyMb": round(copy_bytes / 1024 / 1024, 1),
+        "mergeInsertSeconds": round(insert_seconds, 3),
+        "mergeConflictSeconds": round(conflict_seconds, 3),
+        "rowsUpdatedOnConflict": updated,
+        "uniqueIndexMb": round(index_bytes / 1024 / 1024, 1),
+        "tableMb": round(heap_bytes / 1024 / 1024, 1),
+        "totalMb": round(total_bytes / 1024 / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara hashes CHAR(64) hex vs BYTEA crudo: tamaño de índice y tiempo de merge")
+    parser.add_argument("--connection-string", required=True, help="Cadena de conexión de PostgreSQL")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Número de filas a generar")
+    parser.add_argument("--chunk-size", type=int, default=200000, help="Tamaño de bloque por COPY")
+    parser.add_argument("--copy-format", choices=COPY_FORMATS, default="binary", help="Formato de COPY hacia staging")
+    parser.add_argument("--keep", action="store_true", help="Conservar los esquemas bench_hash_* al terminar")
+    args = parser.parse_args()
+
+    results = []
+    for hash_encoding in HASH_ENCODINGS:
+        result = benchmark_encoding(
+            args.connection_string,
+            args.rows,
+            args.chunk_size,
+            hash_encoding,
+            args.copy_format,
+            args.keep,
+        )
+        results.append(result)
+        print(
+            f"{hash_encoding}: índice {result['uniqueIndexMb']} MB, merge {result['mergeInsertSeconds']}s, "
+            f"COPY {result['copyMb']} MB",
+            file=sys.stderr,
+        )
+
+    print(
+        json.dumps(
+            {"rows": args.rows, "chunkSize": args.chunk_size, "copyFormat": args.copy_format, "results": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_generator import build_dataframe  # noqa: E402
+from etl_processor import canonical_values, digest_column, transform_chunk  # noqa: E402
+from payload_hash import PAYLOAD_HASH_ALGORITHMS, digest_function  # noqa: E402
+
+
+def best_seconds(run, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide payload_hash por algoritmo frente a un hash vectorizado de Polars")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Número de filas a generar")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por algoritmo (se reporta la mejor)")
+    parser.add_argument("--hash-encoding", choices=["hex", "raw"], default="hex", help="Formato de los digests")
+    args = parser.parse_args()
+
+    payload = canonical_values(transform_chunk(build_dataframe(args.rows)), "Benchmark").get_column("payload_hash")
+
+    # Referencia: dos Series.hash de 64 bits (128 bits) corren en Rust sobre todo el buffer.
+    # No sirven para payload_hash porque Polars no garantiza el mismo valor entre versiones.
+    vectorized = best_seconds(lambda: (payload.hash(seed=0), payload.hash(seed=1)), args.repeat)
+
+    results = []
+    for algorithm in PAYLOAD_HASH_ALGORITHMS:
+        try:
+            digest = digest_function(algorithm)
+        except RuntimeError as exc:
+            results.append({"algorithm": algorithm, "skipped": str(exc)})
+            continue
+
+        seconds = best_seconds(lambda: digest_column(payload, args.hash_encoding, digest), args.repeat)
+        results.append({
+            "algorithm": algorithm,
+            "seconds": round(seconds, 3),
+            "rowsPerSecond": round(args.rows / seconds) if seconds else None,
+            "timesVectorized": round(seconds / vectorized, 1) if vectorized else None,
+        })
+
+    print(json.dumps(
+        {
+            "rows": args.rows,
+            "meanPayloadBytes": round(payload.str.len_bytes().mean(), 1),
+            "vectorizedSeconds": round(vectorized, 3),
+            "results": results,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import struct
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+import polars as pl
+
+BINARY_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+BINARY_COPY_TRAILER = struct.pack("!h", -1)
+
+PG_EPOCH_MICROS = 946_684_800_000_000
+NUMERIC_POS = 0x0000
+NUMERIC_NEG = 0x4000
+NUMERIC_MAX_SCALE = 4
+
+FIXED_WIDTH_TYPES = {
+    "int4": (pl.Int32, ">i4"),
+    "int8": (pl.Int64, ">i8"),
+}
+
+
+@dataclass
+class Segment:
+    data: np.ndarray
+    sizes: np.ndarray
+
+
+def fixed_segment(values: np.ndarray, nulls: np.ndarray) -> Segment:
+    height, width = values.shape
+    records = np.empty((height, 4 + width), dtype=np.uint8)
+    records[:, :4] = np.where(nulls, -1, width).astype(">i4").view(np.uint8).reshape(height, 4)
+    records[:, 4:] = values
+
+    if not nulls.any():
+        return Segment(records.reshape(-1), np.full(height, 4 + width, dtype=np.int64))
+
+    keep = np.ones(records.shape, dtype=bool)
+    keep[nulls, 4:] = False
+    return Segment(records[keep], np.where(nulls, 4, 4 + width).astype(np.int64))
+
+
+def encode_integer(series: pl.Series, pg_type: str) -> list[Segment]:
+    dtype, numpy_dtype = FIXED_WIDTH_TYPES[pg_type]
+    values = series.cast(dtype, strict=True)
+    nulls = values.is_null().to_numpy()
+    raw = values.fill_null(0).to_numpy().astype(numpy_dtype)
+    return [fixed_segment(raw.view(np.uint8).reshape(len(raw), -1), nulls)]
+
+
+def encode_numeric(series: pl.Series) -> list[Segment]:
+    scale = series.dtype.scale if isinstance(series.dtype, pl.Decimal) else 2
+    if scale > NUMERIC_MAX_SCALE:
+        raise ValueError(f"Escala NUMERIC no soportada en COPY binario: {scale}")
+
+    scaled = series.cast(pl.Decimal(38, scale), strict=True)
+    nulls = scaled.is_null().to_numpy()
+    unscaled = scaled.to_physical().fill_null(0).cast(pl.Int64).to_numpy()
+
+    magnitude = np.abs(unscaled)
+    integer_part = magnitude // 10**scale
+    fraction = (magnitude % 10**scale) * 10 ** (NUMERIC_MAX_SCALE - scale)
+
+    # NUMERIC(18,2) cabe en 4 grupos base 10000 de parte entera más 1 de fracción;
+    # PostgreSQL elimina los ceros sobrantes al recibir el valor.
+    header = np.empty((len(unscaled), 4), dtype=">i2")
+    header[:, 0] = 5
+    header[:, 1] = 3
+    header[:, 2] = np.where(unscaled < 0, NUMERIC_NEG, NUMERIC_POS).astype(np.uint16).view(np.int16)
+    header[:, 3] = scale
+
+    digits = np.empty((len(unscaled), 5), dtype=">i2")
+    digits[:, 0] = integer_part // 10**12
+    digits[:, 1] = (integer_part // 10**8) % 10**4
+    digits[:, 2] = (integer_part // 10**4) % 10**4
+    digits[:, 3] = integer_part % 10**4
+    digits[:, 4] = fraction
+
+    if (digits[:, 0] >= 10**4).any():
+        raise ValueError("Valor NUMERIC fuera del rango soportado por COPY binario")
+
+    raw = np.concatenate([header.view(np.uint8), digits.view(np.uint8)], axis=1)
+    return [fixed_segment(raw, nulls)]
+
+
+def localize(naive: pl.Series, time_zone: str) -> pl.Series:
+    # Igual que PostgreSQL con el texto del COPY CSV: una hora repetida por el cambio de horario
+    # se toma en horario estándar (la posterior) y una que no existe usa el desfase previo al salto.
+    values = naive.dt.replace_time_zone(time_zone, ambiguous="latest", non_existent="null")
+    gap = values.is_null() & naive.is_not_null()
+    if not gap.any():
+        return values
+
+    before = (naive - timedelta(days=1)).dt.replace_time_zone(time_zone, ambiguous="latest", non_existent="null")
+    # Los desfases son Duration("ms"): sin volver a "us" zip_with truncaría toda la columna.
+    offset = (before.dt.base_utc_offset() + before.dt.dst_offset()).cast(pl.Duration(naive.dtype.time_unit))
+    shifted = (naive - offset).dt.replace_time_zone("UTC").dt.convert_time_zone(time_zone)
+    return values.zip_with(~gap, shifted.dt.cast_time_unit(naive.dtype.time_unit))
+
+
+def encode_timestamptz(series: pl.Series, session_time_zone: str) -> list[Segment]:
+    values = series.dt.cast_time_unit("us")
+    if values.dtype.time_zone is None:
+        values = localize(values, session_time_zone)
+
+    nulls = values.is_null().to_numpy()
+    micros = values.dt.epoch("us").fill_null(PG_EPOCH_MICROS).to_numpy() - PG_EPOCH_MICROS
+    raw = micros.astype(">i8")
+    return [fixed_segment(raw.view(np.uint8).reshape(len(raw), -1), nulls)]
+
+
+def encode_text(series: pl.Series) -> list[Segment]:
+    values = series.cast(pl.Utf8)
+    nulls = values.is_null().to_numpy()
+    lengths = values.str.len_bytes().fill_null(0).to_numpy().astype(np.int64)
+
+    prefix = np.where(nulls, -1, lengths).astype(">i4").view(np.uint8)
+    body = values.str.join("").item().encode("utf-8")
+
+    return [
+        Segment(prefix, np.full(len(lengths), 4, dtype=np.int64)),
+        Segment(np.frombuffer(body, dtype=np.uint8), lengths),
+    ]
+
+
+def encode_uuid(series: pl.Series) -> list[Segment]:
+    nulls = series.is_null().to_numpy()
+    hex_digits = series.cast(pl.Utf8).str.replace_all("-", "").fill_null("0" * 32)
+    raw = np.frombuffer(bytes.fromhex(hex_digits.str.join("").item()), dtype=np.uint8)
+    return [fixed_segment(raw.reshape(len(series), 16), nulls)]
+
+
+def encode_bytea(series: pl.Series) -> list[Segment]:
+    nulls = series.is_null().to_numpy()
+    lengths = series.bin.size().fill_null(0).to_numpy().astype(np.int64)
+    body = b"".join(series.fill_null(b"").to_list())
+    raw = np.frombuffer(body, dtype=np.uint8)
+
+    if len(lengths) and (lengths == lengths[0]).all():
+        return [fixed_segment(raw.reshape(len(lengths), -1), nulls)]
+
+    prefix = np.where(nulls, -1, lengths).astype(">i4").view(np.uint8)
+    return [
+        Segment(prefix, np.full(len(lengths), 4, dtype=np.int64)),
+        Segment(raw, lengths),
+    ]
+
+
+def encode_column(series: pl.Series, pg_type: str, session_time_zone: str) -> list[Segment]:
+    if pg_type in FIXED_WIDTH_TYPES:
+        return encode_integer(series, pg_type)
+    if pg_type == "numeric":
+        return encode_numeric(series)
+    if pg_type == "timestamptz":
+        return encode_timestamptz(series, session_time_zone)
+    if pg_type == "uuid":
+        return encode_uuid(series)
+    if pg_type == "bytea":
+        return encode_bytea(series)
+    return encode_text(series)
+
+
+def encode_binary_copy(frame: pl.DataFrame, column_types: dict[str, str], session_time_zone: str) -> memoryview:
+    height = frame.height
+    segments: list[Segment] = []
+    for name, pg_type in column_types.items():
+        segments.extend(encode_column(frame.get_column(name), pg_type, session_time_zone))
+
+    row_sizes = np.full(height, 2, dtype=np.int64)
+    for segment in segments:
+        row_sizes += segment.sizes
+
+    body_size = int(row_sizes.sum())
+    output = np.empty(len(BINARY_COPY_HEADER) + body_size + len(BINARY_COPY_TRAILER), dtype=np.uint8)
+    output[: len(BINARY_COPY_HEADER)] = np.frombuffer(BINARY_COPY_HEADER, dtype=np.uint8)
+    output[len(output) - len(BINARY_COPY_TRAILER):] = np.frombuffer(BINARY_COPY_TRAILER, dtype=np.uint8)
+
+    row_starts = len(BINARY_COPY_HEADER) + np.cumsum(row_sizes) - row_sizes
+    field_count = np.frombuffer(struct.pack("!h", len(column_types)), dtype=np.uint8)
+    output[row_starts[:, None] + np.arange(2)] = field_count
+
+    # Cada segmento se copia a su posición dentro de cada fila; los de ancho fijo
+    # usan un índice 2D y los variables se expanden byte a byte con np.repeat.
+    cursor = row_starts + 2
+    for segment in segments:
+        sizes = segment.sizes
+        if height and (sizes == sizes[0]).all():
+            width = int(sizes[0])
+            output[cursor[:, None] + np.arange(width)] = segment.data.reshape(height, width)
+        else:
+            source_starts = np.cumsum(sizes) - sizes
+            targets = np.repeat(cursor - source_starts, sizes) + np.arange(len(segment.data))
+            output[targets] = segment.data
+        cursor += sizes
+
+    return memoryview(output)
@@ -1,51 +1,447 @@
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
-import random
+from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 import polars as pl
+import pyarrow.parquet as pq
 
+from etl_processor import CRITICAL_COLUMNS, DATE_COLUMNS, iter_chunks, open_input_file
 
-def build_dataframe(rows: int) -> pl.DataFrame:
-    random.seed(42)
-    now = datetime.now(UTC)
-
-    values = {
-        "CodFondo": [random.randint(100, 999) for _ in range(rows)],
-        "CodClase": [random.choice(["A", "B", "C", None]) for _ in range(rows)],
-        "NumeroCuentaInversion": [f"ACCT-{random.randint(10_000_000, 99_999_999)}" for _ in range(rows)],
-        "TipoIdentificacion": [random.choice(["CC", "NIT", "CE", None]) for _ in range(rows)],
-        "Identificacion": [random.randint(1_000_000, 99_999_999) for _ in range(rows)],
-        "CodDireccion": [random.randint(1, 50) for _ in range(rows)],
-        "Valor": [round(random.uniform(1_000, 999_999), 2) for _ in range(rows)],
-        "Unidades": [random.randint(1, 5_000) for _ in range(rows)],
-        "FechaConstitucion": [now - timedelta(days=random.randint(30, 3650)) for _ in range(rows)],
-        "FechaVencimiento": [now + timedelta(days=random.randint(30, 3650)) for _ in range(rows)],
-        "ObjetivoInversion": [random.randint(1, 9) for _ in range(rows)],
-        "Asesor": [random.randint(1000, 9999) for _ in range(rows)],
-        "Referido": [random.choice(["WEB", "APP", "AGENCIA", None]) for _ in range(rows)],
-        "CanalApertura": [random.choice(["DIGITAL", "PRESENCIAL", None]) for _ in range(rows)],
-        "Oficina": [random.randint(1, 300) for _ in range(rows)],
-        "OficinaApertura": [random.choice([random.randint(1, 300), None]) for _ in range(rows)],
-        "OficinaActual": [random.choice([random.randint(1, 300), None]) for _ in range(rows)],
-        "Bloqueo": [random.randint(0, 1) for _ in range(rows)],
-        "IdCausalBloqueo": [random.choice([random.randint(1, 20), None]) for _ in range(rows)],
-        "DiasPermanencia": [random.randint(1, 2000) for _ in range(rows)],
-        "FechaVtoTeorica": [now + timedelta(days=random.randint(5, 2000)) for _ in range(rows)],
-        "FechaUltimaCancelacion": [random.choice([now - timedelta(days=random.randint(1, 1000)), None]) for _ in range(rows)],
-    }
-
-    return pl.DataFrame(values)
+MICROS_PER_DAY = 86_400_000_000
+OUTPUT_FORMATS = ["parquet", "csv"]
+# Fechas UTC sin desfase: el parseo del ETL no reconoce %z y las dejaría todas nulas.
+CSV_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%.6f"
+# Hora de referencia fija para las fechas: con la misma --seed el archivo (y sus
+# transaction_id) es idéntico entre ejecuciones. --reference-time la cambia.
+DEFAULT_REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=UTC)
+BAD_DATE_VALUES = ["not-a-date", "2024-13-45T25:61:00", "31/02/2024", "00000000"]
+
+
+@dataclass
+class Injection:
+    duplicate_pct: float = 0.0
+    update_pct: float = 0.0
+    null_critical_pct: float = 0.0
+    bad_date_pct: float = 0.0
+
+    def enabled(self) -> bool:
+        return any((self.duplicate_pct, self.update_pct, self.null_critical_pct, self.bad_date_pct))
+
+
+def random_ints(rng: np.random.Generator, rows: int, low: int, high: int) -> np.ndarray:
+    return rng.integers(low, high, size=rows, endpoint=True, dtype=np.int64)
+
+
+def int_column(name: str, rng: np.random.Generator, rows: int, low: int, high: int) -> pl.Series:
+    return pl.Series(name, random_ints(rng, rows, low, high))
+
+
+def nullable_int_column(name: str, rng: np.random.Generator, rows: int, low: int, high: int) -> pl.Series:
+    values = pl.Series(name, random_ints(rng, rows, low, high))
+    return values.set(pl.Series(rng.random(rows) < 0.5), None)
+
+
+def choice_column(name: str, rng: np.random.Generator, rows: int, options: list[str | None]) -> pl.Series:
+    indexes = pl.Series(rng.integers(0, len(options), size=rows, dtype=np.uint32))
+    return pl.Series(name, options, dtype=pl.String).gather(indexes)
+
+
+def datetime_column(name: str, now_micros: int, day_offsets: np.ndarray) -> pl.Series:
+    micros = pl.Series(name, now_micros + day_offsets * MICROS_PER_DAY)
+    return pl.from_epoch(micros, time_unit="us").dt.replace_time_zone("UTC").alias(name)
+
+
+def build_dataframe(
+    rows: int,
+    seed: int | np.random.SeedSequence | None = 42,
+    now: datetime | None = None,
+) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    now = now or DEFAULT_REFERENCE_TIME
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=UTC)
+    now_micros = (now - datetime(1970, 1, 1, tzinfo=UTC)) // timedelta(microseconds=1)
+
+    accounts = int_column("NumeroCuentaInversion", rng, rows, 10_000_000, 99_999_999)
+    last_cancellation = datetime_column("FechaUltimaCancelacion", now_micros, -random_ints(rng, rows, 1, 1000))
+
+    return pl.DataFrame(
+        [
+            int_column("CodFondo", rng, rows, 100, 999),
+            choice_column("CodClase", rng, rows, ["A", "B", "C", None]),
+            ("ACCT-" + accounts.cast(pl.String)).alias("NumeroCuentaInversion"),
+            choice_column("TipoIdentificacion", rng, rows, ["CC", "NIT", "CE", None]),
+            int_column("Identificacion", rng, rows, 1_000_000, 99_999_999),
+            int_column("CodDireccion", rng, rows, 1, 50),
+            pl.Series("Valor", np.round(rng.uniform(1_000, 999_999, size=rows), 2)),
+            int_column("Unidades", rng, rows, 1, 5_000),
+            datetime_column("FechaConstitucion", now_micros, -random_ints(rng, rows, 30, 3650)),
+            datetime_column("FechaVencimiento", now_micros, random_ints(rng, rows, 30, 3650)),
+            int_column("ObjetivoInversion", rng, rows, 1, 9),
+            int_column("Asesor", rng, rows, 1000, 9999),
+            choice_column("Referido", rng, rows, ["WEB", "APP", "AGENCIA", None]),
+            choice_column("CanalApertura", rng, rows, ["DIGITAL", "PRESENCIAL", None]),
+            int_column("Oficina", rng, rows, 1, 300),
+            nullable_int_column("OficinaApertura", rng, rows, 1, 300),
+            nullable_int_column("OficinaActual", rng, rows, 1, 300),
+            int_column("Bloqueo", rng, rows, 0, 1),
+            nullable_int_column("IdCausalBloqueo", rng, rows, 1, 20),
+            int_column("DiasPermanencia", rng, rows, 1, 2000),
+            datetime_column("FechaVtoTeorica", now_micros, random_ints(rng, rows, 5, 2000)),
+            last_cancellation.set(pl.Series(rng.random(rows) < 0.5), None),
+        ]
+    )
+
+
+def change_payload(df: pl.DataFrame, mask: np.ndarray, rng: np.random.Generator) -> pl.DataFrame:
+    # Solo cambian columnas fuera de BUSINESS_KEY_COLUMNS: mismo transaction_id, otro payload_hash.
+    if not mask.any():
+        return df
+
+    changed = pl.Series(mask)
+    return df.with_columns(
+        pl.when(changed)
+        .then(pl.col("Valor").cast(pl.Float64) + pl.Series(np.round(rng.uniform(1, 10_000, size=len(mask)), 2)))
+        .otherwise(pl.col("Valor").cast(pl.Float64))
+        .cast(df.schema["Valor"])
+        .alias("Valor"),
+        pl.when(changed)
+        .then(pl.col("Unidades") + pl.Series(rng.integers(1, 100, size=len(mask), endpoint=True)))
+        .otherwise(pl.col("Unidades"))
+        .cast(df.schema["Unidades"])
+        .alias("Unidades"),
+    )
+
+
+def null_random_column(df: pl.DataFrame, columns: list[str], mask: np.ndarray, rng: np.random.Generator) -> pl.DataFrame:
+    targets = rng.integers(0, len(columns), size=len(mask))
+    return df.with_columns(
+        pl.when(pl.Series(mask & (targets == index))).then(None).otherwise(pl.col(column)).alias(column)
+        for index, column in enumerate(columns)
+    )
+
+
+def share_mask(rng: np.random.Generator, rows: int, pct: float) -> np.ndarray:
+    return rng.random(rows) < pct / 100
+
+
+def as_date_strings(df: pl.DataFrame) -> pl.DataFrame:
+    return df.with_columns(
+        pl.col(column).dt.to_string(CSV_DATE_FORMAT) if df.schema[column].is_temporal() else pl.col(column).cast(pl.String)
+        for column in DATE_COLUMNS
+    )
+
+
+def inject(df: pl.DataFrame, injection: Injection, rng: np.random.Generator) -> pl.DataFrame:
+    rows = df.height
+
+    # Duplicados exactos y de llave de negocio: la fila destino se reemplaza por una copia de
+    # otra fila del mismo lote, así --rows no cambia y el dedup del merge tiene trabajo real.
+    duplicates = round(rows * injection.duplicate_pct / 100)
+    updates = round(rows * injection.update_pct / 100)
+    if duplicates + updates and rows > duplicates + updates:
+        order = rng.permutation(rows)
+        targets = order[: duplicates + updates]
+        sources = rng.choice(order[duplicates + updates:], size=len(targets))
+
+        indexes = np.arange(rows)
+        indexes[targets] = sources
+        df = df[indexes]
+
+        updated = np.zeros(rows, dtype=bool)
+        updated[targets[duplicates:]] = True
+        df = change_payload(df, updated, rng)
+
+    if injection.null_critical_pct:
+        df = null_random_column(df, CRITICAL_COLUMNS, share_mask(rng, rows, injection.null_critical_pct), rng)
+
+    # Las fechas inválidas no caben en una columna Datetime: con --bad-date-pct las columnas
+    # de fecha se emiten siempre como texto, igual que en un CSV.
+    if injection.bad_date_pct:
+        df = as_date_strings(df)
+        bad = share_mask(rng, rows, injection.bad_date_pct)
+        targets = rng.integers(0, len(DATE_COLUMNS), size=rows)
+        values = pl.Series(BAD_DATE_VALUES).gather(pl.Series(rng.integers(0, len(BAD_DATE_VALUES), size=rows)))
+        df = df.with_columns(
+            pl.when(pl.Series(bad & (targets == index))).then(values).otherwise(pl.col(column)).alias(column)
+            for index, column in enumerate(DATE_COLUMNS)
+        )
+
+    return df
+
+
+def iter_batches(
+    rows: int,
+    batch_rows: int,
+    seed: int | np.random.SeedSequence | None = 42,
+    now: datetime | None = None,
+    injection: Injection | None = None,
+) -> Iterator[pl.DataFrame]:
+    now = now or DEFAULT_REFERENCE_TIME
+    batch_count = max(1, -(-rows // batch_rows))
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    # Cada lote recibe su propia semilla derivada, así el resultado es reproducible sin
+    # mantener el generador entre lotes; todos comparten la misma hora de referencia.
+    for index, batch_seed in enumerate(sequence.spawn(batch_count)):
+        batch = build_dataframe(min(batch_rows, rows - index * batch_rows), seed=batch_seed, now=now)
+        if injection is not None and injection.enabled():
+            batch = inject(batch, injection, np.random.default_rng(batch_seed.spawn(1)[0]))
+        yield batch
+
+
+def iter_delta_batches(
+    base_path: Path,
+    batch_rows: int,
+    seed: int,
+    update_pct: float,
+    new_pct: float,
+    now: datetime | None = None,
+    injection: Injection | None = None,
+) -> Iterator[pl.DataFrame]:
+    now = now or DEFAULT_REFERENCE_TIME
+    sequence = np.random.SeedSequence(seed)
+    schema = None
+    base_rows = 0
+
+    # Archivo "día 2": las filas del día 1 se reescriben en orden, una parte con payload
+    # cambiado (actualizaciones) y el resto idénticas, y al final se agregan filas nuevas.
+    for chunk in iter_chunks(open_input_file(base_path), batch_rows):
+        rng = np.random.default_rng(sequence.spawn(1)[0])
+        batch = change_payload(chunk, share_mask(rng, chunk.height, update_pct), rng)
+        if injection is not None and injection.enabled():
+            batch = inject(batch, injection, rng)
+        schema = schema or batch.schema
+        base_rows += chunk.height
+        yield batch
+
+    new_rows = round(base_rows * new_pct / 100)
+    if not new_rows:
+        return
+
+    for batch in iter_batches(new_rows, batch_rows, sequence.spawn(1)[0], now, injection):
+        if schema is not None and batch.schema != schema:
+            if any(schema[column] == pl.String for column in DATE_COLUMNS):
+                batch = as_date_strings(batch)
+            batch = batch.cast(dict(schema))
+        yield batch
+
+
+def write_batches(batches: Iterator[pl.DataFrame], output_path: Path, output_format: str) -> None:
+    if output_format == "parquet":
+        writer: pq.ParquetWriter | None = None
+        try:
+            for batch in batches:
+                table = batch.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema, compression="zstd")
+                writer.write_table(table, row_group_size=max(1, batch.height))
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    with output_path.open("wb") as output:
+        for index, batch in enumerate(batches):
+            batch.write_csv(output, include_header=index == 0)
+
+
+def resolve_format(output_path: Path, output_format: str | None) -> str:
+    if output_format:
+        return output_format
+    return "parquet" if output_path.suffix.lower() == ".parquet" else "csv"
+
+
+def shard_path(output_path: Path, shard: int, shards: int) -> Path:
+    return output_path.with_name(f"{output_path.stem}-part-{shard:05d}-of-{shards:05d}{output_path.suffix}")
+
+
+def shard_rows(rows: int, shards: int) -> list[int]:
+    base, remainder = divmod(rows, shards)
+    return [base + (1 if shard < remainder else 0) for shard in range(shards)]
+
+
+def generate_shard(
+    output_path: str,
+    output_format: str,
+    rows: int,
+    batch_rows: int,
+    seed: np.random.SeedSequence,
+    now: datetime,
+    injection: Injection,
+) -> str:
+    write_batches(iter_batches(rows, batch_rows, seed, now, injection), Path(output_path), output_format)
+    return output_path
+
+
+def combine_parts(parts: list[Path], output_path: Path, output_format: str) -> None:
+    if output_format == "parquet":
+        pl.scan_parquet([part.as_posix() for part in parts]).sink_parquet(output_path, compression="zstd")
+    else:
+        with output_path.open("wb") as output:
+            for index, part in enumerate(parts):
+                with part.open("rb") as source:
+                    header = source.readline()
+                    if index == 0:
+                        output.write(header)
+                    while block := source.read(16 * 1024 * 1024):
+                        output.write(block)
+
+    for part in parts:
+        part.unlink()
+
+
+def generate_sharded(
+    output_path: Path,
+    output_format: str,
+    rows: int,
+    batch_rows: int,
+    seed: int,
+    shards: int,
+    workers: int,
+    combine: bool,
+    injection: Injection,
+    now: datetime = DEFAULT_REFERENCE_TIME,
+) -> list[Path]:
+    if shards == 1:
+        write_batches(iter_batches(rows, batch_rows, seed, now, injection), output_path, output_format)
+        return [output_path]
+
+    # La semilla de cada shard depende solo de --seed y de su índice, no de --workers,
+    # así el resultado es el mismo con cualquier número de procesos.
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    parts = [shard_path(output_path, shard, shards) for shard in range(shards)]
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(generate_shard, str(part), output_format, part_rows, batch_rows, part_seed, now, injection)
+            for part, part_rows, part_seed in zip(parts, shard_rows(rows, shards), seeds)
+        ]
+        for future in futures:
+            future.result()
+
+    if not combine:
+        return parts
+
+    combine_parts(parts, output_path, output_format)
+    return [output_path]
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Genera CSV de prueba para ingesta masiva")
-    parser.add_argument("--output", default="transactions_5000000.csv", help="Ruta del CSV de salida")
+    parser = argparse.ArgumentParser(description="Genera archivos de prueba (CSV o Parquet) para ingesta masiva")
+    parser.add_argument("--output", default="transactions_5000000.csv", help="Ruta del archivo de salida")
     parser.add_argument("--rows", type=int, default=5_000_000, help="Número de filas a generar")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador aleatorio")
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Formato de salida (por defecto se deduce de la extensión de --output)",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=1_000_000,
+        help="Filas por lote generado y escrito (un row group por lote en Parquet)",
+    )
+    parser.add_argument("--shards", type=int, default=1, help="Número de shards (archivos parte) a generar")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo para generar shards")
+    parser.add_argument(
+        "--combine",
+        action="store_true",
+        help="Unir los shards en el archivo de --output en vez de dejar archivos parte",
+    )
+    parser.add_argument("--duplicate-pct", type=float, default=0.0, help="Porcentaje de filas duplicadas exactas")
+    parser.add_argument(
+        "--update-pct",
+        type=float,
+        default=0.0,
+        help="Porcentaje de filas con la misma llave de negocio y payload distinto",
+    )
+    parser.add_argument(
+        "--null-critical-pct",
+        type=float,
+        default=0.0,
+        help="Porcentaje de filas con un nulo en una columna crítica",
+    )
+    parser.add_argument(
+        "--bad-date-pct",
+        type=float,
+        default=0.0,
+        help="Porcentaje de filas con una fecha no parseable (las fechas se emiten como texto)",
+    )
+    parser.add_argument(
+        "--delta-from",
+        default="",
+        help="Archivo del día 1: genera un archivo del día 2 con actualizaciones y filas nuevas",
+    )
+    parser.add_argument(
+        "--delta-update-pct",
+        type=float,
+        default=10.0,
+        help="Porcentaje de filas del día 1 con payload cambiado en el día 2",
+    )
+    parser.add_argument(
+        "--delta-new-pct",
+        type=float,
+        default=5.0,
+        help="Filas nuevas del día 2, como porcentaje de las filas del día 1",
+    )
+    parser.add_argument(
+        "--reference-time",
+        default="",
+        help=f"Fecha ISO desde la que se calculan las fechas generadas, UTC si no trae zona (por defecto {DEFAULT_REFERENCE_TIME.isoformat()})",
+    )
     args = parser.parse_args()
 
-    df = build_dataframe(args.rows)
-    df.write_csv(args.output)
-    print(f"CSV generado: {args.output} ({args.rows} filas)")
+    if args.batch_rows <= 0:
+        raise ValueError("--batch-rows debe ser mayor que 0")
+    if args.shards <= 0 or args.workers <= 0:
+        raise ValueError("--shards y --workers deben ser mayores que 0")
+    if args.delta_from and args.shards > 1:
+        raise ValueError("--delta-from no admite --shards")
+
+    now = datetime.fromisoformat(args.reference_time) if args.reference_time else DEFAULT_REFERENCE_TIME
+    injection = Injection(args.duplicate_pct, args.update_pct, args.null_critical_pct, args.bad_date_pct)
+    output_path = Path(args.output)
+    output_format = resolve_format(output_path, args.format)
+
+    if args.delta_from:
+        batches = iter_delta_batches(
+            Path(args.delta_from),
+            args.batch_rows,
+            args.seed,
+            args.delta_update_pct,
+            args.delta_new_pct,
+            now,
+            injection,
+        )
+        write_batches(batches, output_path, output_format)
+        print(f"{output_format.upper()} delta generado: {output_path} (base: {args.delta_from})")
+        return
+
+    outputs = generate_sharded(
+        output_path,
+        output_format,
+        args.rows,
+        args.batch_rows,
+        args.seed,
+        args.shards,
+        args.workers,
+        args.combine,
+        injection,
+        now,
+    )
+
+    for output in outputs:
+        print(f"{output_format.upper()} generado: {output}")
+    print(f"Total: {args.rows} filas en {len(outputs)} archivo(s)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+import io
+import json
+import os
+import re
+from pathlib import Path
+
+import polars as pl
+import psycopg
+from psycopg import sql
+
+from file_hash import DEFAULT_CACHE_PATH
+from hash_encoding import hash_params, hex_columns, hex_sql
+from hash_index import HashIndex
+
+SNAPSHOT_DIR = DEFAULT_CACHE_PATH.parent / "hash_snapshots"
+SNAPSHOT_SCHEMA = {"transaction_id": pl.String, "payload_hash": pl.String}
+UNCHANGED_COLUMN = "__unchanged"
+KEY_COLUMN = "__key"
+
+
+def default_snapshot_path(source_system: str) -> Path:
+    return SNAPSHOT_DIR / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', source_system)}.parquet"
+
+
+def snapshot_state(conn: psycopg.Connection, source_system: str) -> dict[str, object]:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*), MAX(updated_at) FROM transactions WHERE source_system = %s",
+            (source_system,),
+        )
+        rows, max_updated_at = cursor.fetchone()
+    return {"rows": rows, "maxUpdatedAt": max_updated_at.isoformat() if max_updated_at else None}
+
+
+def download_snapshot(
+    conn: psycopg.Connection,
+    source_system: str,
+    snapshot_path: Path,
+    hash_encoding: str = "hex",
+) -> None:
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_csv = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.csv")
+    temp_parquet = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    statement = sql.SQL(
+        "COPY (SELECT {}, {} FROM transactions WHERE source_system = {}) TO STDOUT WITH (FORMAT CSV)"
+    ).format(
+        hex_sql("transaction_id", hash_encoding),
+        hex_sql("payload_hash", hash_encoding),
+        sql.Literal(source_system),
+    )
+
+    try:
+        with temp_csv.open("wb") as output, conn.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for block in copy:
+                    output.write(block)
+
+        pl.scan_csv(temp_csv, has_header=False, schema=SNAPSHOT_SCHEMA).sink_parquet(temp_parquet)
+        os.replace(temp_parquet, snapshot_path)
+    finally:
+        temp_csv.unlink(missing_ok=True)
+        temp_parquet.unlink(missing_ok=True)
+
+
+def refresh_snapshot(
+    conn: psycopg.Connection,
+    source_system: str,
+    snapshot_path: Path,
+    hash_encoding: str = "hex",
+) -> bool:
+    # El parquet local se reutiliza mientras el conteo y el MAX(updated_at) de la base coincidan
+    # con los guardados al descargarlo; cualquier insert/update/delete posterior lo invalida.
+    state_path = snapshot_path.with_suffix(".json")
+    state = snapshot_state(conn, source_system)
+    conn.commit()
+
+    if snapshot_path.exists() and state_path.exists():
+        try:
+            if json.loads(state_path.read_text(encoding="utf-8")) == state:
+                return False
+        except ValueError:
+            pass
+
+    download_snapshot(conn, source_system, snapshot_path, hash_encoding)
+    conn.commit()
+    state_path.write_text(json.dumps(state), encoding="utf-8")
+    return True
+
+
+def load_snapshot(snapshot_path: Path) -> pl.DataFrame:
+    return pl.read_parquet(snapshot_path).with_columns(pl.lit(True).alias(UNCHANGED_COLUMN))
+
+
+def unchanged_key(column: str = "transaction_id") -> pl.Expr:
+    # 128 bits del transaction_id bastan para identificar la llave y ocupan 16 bytes por fila.
+    return pl.col(column).str.slice(0, 32).str.decode("hex").alias(KEY_COLUMN)
+
+
+def unchanged_mask(hashes: pl.DataFrame, reference: pl.DataFrame | HashIndex) -> pl.Series:
+    if isinstance(reference, HashIndex):
+        return pl.Series(reference.unchanged_mask(hashes.get_column("transaction_id"), hashes.get_column("payload_hash")))
+
+    return (
+        hashes.join(reference, on=["transaction_id", "payload_hash"], how="left", maintain_order="left")
+        .get_column(UNCHANGED_COLUMN)
+        .is_not_null()
+    )
+
+
+def split_unchanged(frame: pl.DataFrame, reference: pl.DataFrame | HashIndex) -> tuple[pl.DataFrame, pl.DataFrame]:
+    # Las comparaciones se hacen sobre el hexadecimal, igual que en el snapshot y el índice.
+    hashes = hex_columns(frame)
+    unchanged = unchanged_mask(hashes, reference)
+    unchanged_keys = hashes.select(unchanged_key(), frame.get_column("source_row")).filter(unchanged)
+    return frame.filter(~unchanged), unchanged_keys
+
+
+def reconcile_unchanged(
+    conn: psycopg.Connection,
+    process_id: str,
+    unchanged: list[pl.DataFrame],
+    hash_encoding: str = "hex",
+) -> int:
+    # Una fila omitida por no tener cambios puede ser la última ocurrencia de su llave en el
+    # archivo; si antes hubo otra fila con payload distinto, esa ya está en staging y el merge
+    # la aplicaría. Se borran de staging las llaves cuya última ocurrencia no tenía cambios.
+    if not unchanged:
+        return 0
+
+    staged_csv = io.BytesIO()
+    statement = sql.SQL(
+        "COPY (SELECT {}, MAX(source_row) FROM staging_transactions "
+        "WHERE process_id = {} GROUP BY transaction_id) TO STDOUT WITH (FORMAT CSV)"
+    ).format(hex_sql("transaction_id", hash_encoding), sql.Literal(process_id))
+    with conn.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for block in copy:
+                staged_csv.write(block)
+
+    staged = pl.read_csv(
+        staged_csv.getvalue(),
+        has_header=False,
+        schema={"transaction_id": pl.String, "staged_row": pl.Int64},
+    )
+    if staged.height == 0:
+        return 0
+
+    latest_unchanged = pl.concat(unchanged).group_by(KEY_COLUMN).agg(pl.col("source_row").max())
+    superseded = (
+        staged.with_columns(unchanged_key())
+        .join(latest_unchanged, on=KEY_COLUMN)
+        .filter(pl.col("source_row") > pl.col("staged_row"))
+        .get_column("transaction_id")
+        .to_list()
+    )
+    if not superseded:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM staging_transactions WHERE process_id = %s AND transaction_id = ANY(%s)",
+            (process_id, hash_params(superseded, hash_encoding)),
+        )
+        deleted = cursor.rowcount
+    conn.commit()
+    return deleted
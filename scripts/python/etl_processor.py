@@ -1,15 +1,37 @@
 import argparse
-import csv
-import hashlib
+import multiprocessing
 import io
 import json
-from dataclasses import dataclass
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterator
 
 import polars as pl
 import psycopg
+import pyarrow.parquet as pq
+from psycopg.types.json import Jsonb
+
+from binary_copy import encode_binary_copy
+from delta_snapshot import (
+    default_snapshot_path,
+    load_snapshot,
+    reconcile_unchanged,
+    refresh_snapshot,
+    split_unchanged,
+)
+from file_hash import DEFAULT_CACHE_PATH, compute_file_hash
+from hash_encoding import HASH_ENCODINGS, check_hash_encoding, hex_columns
+from hash_index import INDEX_DIR, HashIndex, prepare_index, write_pending
+from payload_hash import PAYLOAD_HASH_ALGORITHMS, check_payload_hash_algorithm, digest_function, sha256_digest
+from pipeline import END_OF_STREAM, QUEUE_POLL_SECONDS, Pipeline, StageStats
+from quarantine import QuarantineWriter
+from validation import REJECT_REASON_COLUMN, REQUIRED_RULE, load_rules, reject_counts, split_rejected
 
 CRITICAL_COLUMNS = [
     "CodFondo",
@@ -56,6 +78,63 @@ SOURCE_COLUMNS = [
     "FechaUltimaCancelacion",
 ]
 
+# Tipos de los cast de transform_chunk y texto para las columnas que staging guarda como text.
+# Las fechas quedan como texto para transform_chunk.
+SOURCE_DTYPES = {
+    "CodFondo": pl.Int32,
+    "CodClase": pl.String,
+    "NumeroCuentaInversion": pl.String,
+    "TipoIdentificacion": pl.String,
+    "Identificacion": pl.Int32,
+    "CodDireccion": pl.Int32,
+    "Valor": pl.Decimal(18, 2),
+    "Unidades": pl.Int64,
+    "FechaConstitucion": pl.String,
+    "FechaVencimiento": pl.String,
+    "ObjetivoInversion": pl.Int64,
+    "Asesor": pl.Int32,
+    "Referido": pl.String,
+    "CanalApertura": pl.String,
+    "Oficina": pl.Int32,
+    "OficinaApertura": pl.Int32,
+    "OficinaActual": pl.Int32,
+    "Bloqueo": pl.Int32,
+    "IdCausalBloqueo": pl.Int32,
+    "DiasPermanencia": pl.Int64,
+    "FechaVtoTeorica": pl.String,
+    "FechaUltimaCancelacion": pl.String,
+}
+
+CSV_INFER_SCHEMA_LENGTH = 10000
+
+CSV_SCHEMA_DTYPES = {
+    "String": pl.String,
+    "Int32": pl.Int32,
+    "Int64": pl.Int64,
+    "Float64": pl.Float64,
+}
+
+# Sin --validation-rules solo se rechazan filas con nulos en columnas críticas (también tras
+# los cast no estrictos, cuando un valor no convierte).
+DEFAULT_VALIDATION_RULES = [{"code": REQUIRED_RULE, "type": "not_null", "columns": CRITICAL_COLUMNS}]
+
+BUSINESS_KEY_COLUMNS = [
+    "CodFondo",
+    "NumeroCuentaInversion",
+    "Identificacion",
+    "CodDireccion",
+    "FechaConstitucion",
+]
+
+# Caracteres que str.strip() considera espacio en blanco; se replican para que
+# la normalización columnar coincida byte a byte con normalize_value.
+PYTHON_WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003"
+    "\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+
+SOURCE_ROW_COLUMN = "__source_row"
+
 COPY_COLUMNS = [
     "process_id",
     "source_hash",
@@ -84,14 +163,149 @@ COPY_COLUMNS = [
     "dias_permanencia",
     "fecha_vto_teorica",
     "fecha_ultima_cancelacion",
+    "source_row",
 ]
 
 
+COPY_COLUMN_TYPES = {
+    "process_id": "uuid",
+    "source_hash": "bpchar",
+    "source_system": "varchar",
+    "transaction_id": "bpchar",
+    "payload_hash": "bpchar",
+    "cod_fondo": "int4",
+    "cod_clase": "text",
+    "numero_cuenta_inversion": "text",
+    "tipo_identificacion": "text",
+    "identificacion": "int4",
+    "cod_direccion": "int4",
+    "valor": "numeric",
+    "unidades": "int8",
+    "fecha_constitucion": "timestamptz",
+    "fecha_vencimiento": "timestamptz",
+    "objetivo_inversion": "int8",
+    "asesor": "int4",
+    "referido": "text",
+    "canal_apertura": "text",
+    "oficina": "int4",
+    "oficina_apertura": "int4",
+    "oficina_actual": "int4",
+    "bloqueo": "int4",
+    "id_causal_bloqueo": "int4",
+    "dias_permanencia": "int8",
+    "fecha_vto_teorica": "timestamptz",
+    "fecha_ultima_cancelacion": "timestamptz",
+    "source_row": "int8",
+}
+
+COPY_FORMATS = ["csv", "binary"]
+
+DELTA_SOURCES = ["snapshot", "index"]
+
+COPY_WRITE_SIZE = 4 * 1024 * 1024
+
+STAGING_TABLE = "staging_transactions"
+PARTITION_COLUMN = "__partition"
+
+DATE_MEMO_MAX_ENTRIES = 1_000_000
+
+
 @dataclass
 class Metrics:
     rows_read: int = 0
     rows_loaded: int = 0
     rows_rejected: int = 0
+    rows_unchanged: int = 0
+    rows_rejected_by_rule: dict[str, int] = field(default_factory=dict)
+    quarantine_path: Path | None = None
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+@dataclass
+class LoadTask:
+    rows_read: int
+    rows_loaded: int
+    row_offset: int = 0
+    frame: pl.DataFrame | None = None
+    payloads: list[tuple[str, bytes]] | None = None
+    prepare_seconds: float = 0.0
+    rows_unchanged: int = 0
+    unchanged_keys: pl.DataFrame | None = None
+    rejects: dict[str, int] = field(default_factory=dict)
+    rejected: pl.DataFrame | None = None
+
+
+class ProgressTracker:
+    def __init__(self) -> None:
+        self.metrics = Metrics()
+        self.unchanged_keys: list[pl.DataFrame] = []
+        self._lock = threading.Lock()
+
+    def restore(self, checkpoints: dict[int, tuple[int, int, int, dict[str, int]]]) -> None:
+        if checkpoints:
+            rejects: dict[str, int] = {}
+            for _, _, _, chunk_rejects in checkpoints.values():
+                for code, rows in chunk_rejects.items():
+                    rejects[code] = rejects.get(code, 0) + rows
+            self.record(
+                sum(rows_read for rows_read, _, _, _ in checkpoints.values()),
+                sum(rows_loaded for _, rows_loaded, _, _ in checkpoints.values()),
+                sum(rows_unchanged for _, _, rows_unchanged, _ in checkpoints.values()),
+                rejects,
+            )
+
+    def keep_unchanged(self, unchanged_keys: pl.DataFrame) -> None:
+        with self._lock:
+            self.unchanged_keys.append(unchanged_keys)
+
+    def supersede(self, rows: int) -> None:
+        self.metrics.rows_loaded -= rows
+        self.metrics.rows_unchanged += rows
+
+    def record(
+        self,
+        rows_read: int,
+        rows_loaded: int,
+        rows_unchanged: int = 0,
+        rejects: dict[str, int] | None = None,
+    ) -> None:
+        with self._lock:
+            self.metrics.rows_read += rows_read
+            self.metrics.rows_loaded += rows_loaded
+            self.metrics.rows_unchanged += rows_unchanged
+            self.metrics.rows_rejected += rows_read - rows_loaded - rows_unchanged
+            for code, rows in (rejects or {}).items():
+                self.metrics.rows_rejected_by_rule[code] = self.metrics.rows_rejected_by_rule.get(code, 0) + rows
+
+            print(
+                f"PROGRESS rows_read={self.metrics.rows_read} "
+                f"rows_loaded={self.metrics.rows_loaded} "
+                f"rows_rejected={self.metrics.rows_rejected} "
+                f"rows_unchanged={self.metrics.rows_unchanged}",
+                flush=True,
+            )
+
+
+class DateParseMemo:
+    # Textos de fecha ya parseados en bloques anteriores: cada bloque solo parsea los nuevos.
+    # El formato se infiere del primer texto nuevo, no del primero del bloque.
+    def __init__(self, max_entries: int = DATE_MEMO_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.parsed: pl.DataFrame | None = None
+
+    def resolve(self, texts: pl.Series) -> pl.DataFrame:
+        if self.parsed is not None:
+            missing = pl.DataFrame({"text": texts}).join(self.parsed, on="text", how="anti").get_column("text")
+            if missing.len() == 0:
+                return self.parsed
+
+            parsed = date_mapping(missing)
+            if parsed.schema == self.parsed.schema and self.parsed.height + parsed.height <= self.max_entries:
+                self.parsed = pl.concat([self.parsed, parsed])
+                return self.parsed
+
+        self.parsed = date_mapping(texts)
+        return self.parsed
 
 
 def normalize_value(value: object) -> str:
@@ -102,134 +316,278 @@ def normalize_value(value: object) -> str:
     return str(value).strip()
 
 
-def sha256_from_values(values: Iterable[object]) -> str:
-    canonical = "|".join(normalize_value(v) for v in values)
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+def normalize_expr(column: str, dtype: pl.DataType) -> pl.Expr:
+    expr = pl.col(column)
 
+    if dtype == pl.String:
+        normalized = expr.str.strip_chars(PYTHON_WHITESPACE)
+    elif dtype.is_integer() or isinstance(dtype, pl.Decimal):
+        normalized = expr.cast(pl.Utf8)
+    elif isinstance(dtype, pl.Datetime):
+        offset = "%:z" if dtype.time_zone else ""
+        as_micros = expr.dt.cast_time_unit("us")
+        normalized = (
+            pl.when(as_micros.dt.microsecond() == 0)
+            .then(as_micros.dt.strftime(f"%Y-%m-%dT%H:%M:%S{offset}"))
+            .otherwise(as_micros.dt.strftime(f"%Y-%m-%dT%H:%M:%S%.6f{offset}"))
+        )
+    else:
+        normalized = expr.map_elements(normalize_value, return_dtype=pl.Utf8)
 
-def compute_file_hash(file_path: Path) -> str:
-    hasher = hashlib.sha256()
-    with file_path.open("rb") as source:
-        for chunk in iter(lambda: source.read(1024 * 1024), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+    return normalized.fill_null("")
 
 
-def build_copy_rows(df: pl.DataFrame, process_id: str, source_hash: str, source_system: str) -> list[list[object]]:
-    rows: list[list[object]] = []
-    records = df.to_dicts()
+def digest_column(
+    canonical: pl.Series,
+    hash_encoding: str = "hex",
+    digest: Callable[[bytes], bytes] = sha256_digest,
+) -> pl.Series:
+    digests = pl.Series(canonical.name, list(map(digest, canonical.cast(pl.Binary).to_list())), dtype=pl.Binary)
+    return digests if hash_encoding == "raw" else digests.bin.encode("hex")
 
-    for record in records:
-        business_key = [
-            record["CodFondo"],
-            record["NumeroCuentaInversion"],
-            record["Identificacion"],
-            record["CodDireccion"],
-            record["FechaConstitucion"],
-            source_system,
-        ]
-        payload_values = [record[col] for col in SOURCE_COLUMNS] + [source_system]
 
-        row = [
-            process_id,
-            source_hash,
-            source_system,
-            sha256_from_values(business_key),
-            sha256_from_values(payload_values),
-            record["CodFondo"],
-            record["CodClase"],
-            record["NumeroCuentaInversion"],
-            record["TipoIdentificacion"],
-            record["Identificacion"],
-            record["CodDireccion"],
-            record["Valor"],
-            record["Unidades"],
-            record["FechaConstitucion"],
-            record["FechaVencimiento"],
-            record["ObjetivoInversion"],
-            record["Asesor"],
-            record["Referido"],
-            record["CanalApertura"],
-            record["Oficina"],
-            record["OficinaApertura"],
-            record["OficinaActual"],
-            record["Bloqueo"],
-            record["IdCausalBloqueo"],
-            record["DiasPermanencia"],
-            record["FechaVtoTeorica"],
-            record["FechaUltimaCancelacion"],
-        ]
-        rows.append(row)
-
-    return rows
-
-
-def transform_chunk(df: pl.DataFrame) -> pl.DataFrame:
-    transformed = (
-        df.select(SOURCE_COLUMNS)
-        .drop_nulls(CRITICAL_COLUMNS)
-        .with_columns([
-            pl.col("CodFondo").cast(pl.Int32, strict=False),
-            pl.col("Identificacion").cast(pl.Int32, strict=False),
-            pl.col("CodDireccion").cast(pl.Int32, strict=False),
-            pl.col("Valor").cast(pl.Decimal(18, 2), strict=False),
-            pl.col("Unidades").cast(pl.Int64, strict=False),
-            pl.col("ObjetivoInversion").cast(pl.Int64, strict=False),
-            pl.col("Asesor").cast(pl.Int32, strict=False),
-            pl.col("Oficina").cast(pl.Int32, strict=False),
-            pl.col("Bloqueo").cast(pl.Int32, strict=False),
-            pl.col("DiasPermanencia").cast(pl.Int64, strict=False),
-            pl.col("OficinaApertura").cast(pl.Int32, strict=False),
-            pl.col("OficinaActual").cast(pl.Int32, strict=False),
-            pl.col("IdCausalBloqueo").cast(pl.Int32, strict=False),
-        ])
-        .drop_nulls(CRITICAL_COLUMNS)
-    )
-
-    for date_col in DATE_COLUMNS:
-        transformed = transformed.with_columns(
-            pl.when(pl.col(date_col).is_null())
-            .then(None)
-            .otherwise(
-                pl.col(date_col)
-                .cast(pl.Utf8)
-                .str.strptime(pl.Datetime, strict=False, exact=False)
-            )
-            .alias(date_col)
-        )
+def canonical_values(df: pl.DataFrame, source_system: str) -> pl.DataFrame:
+    normalized_system = pl.lit(normalize_value(source_system))
+    return df.select(
+        pl.concat_str(
+            [normalize_expr(col, df.schema[col]) for col in BUSINESS_KEY_COLUMNS] + [normalized_system],
+            separator="|",
+        ).alias("transaction_id"),
+        pl.concat_str(
+            [normalize_expr(col, df.schema[col]) for col in SOURCE_COLUMNS] + [normalized_system],
+            separator="|",
+        ).alias("payload_hash"),
+    )
+
+
+def add_hash_columns(
+    df: pl.DataFrame,
+    source_system: str,
+    hash_encoding: str = "hex",
+    payload_hash_algorithm: str = "sha256",
+) -> pl.DataFrame:
+    canonical = canonical_values(df, source_system)
+    return df.with_columns(
+        digest_column(canonical.get_column("transaction_id"), hash_encoding),
+        digest_column(canonical.get_column("payload_hash"), hash_encoding, digest_function(payload_hash_algorithm)),
+    )
+
+
+def build_copy_frame(
+    df: pl.DataFrame,
+    process_id: str,
+    source_hash: str,
+    source_system: str,
+    hash_encoding: str = "hex",
+    payload_hash_algorithm: str = "sha256",
+) -> pl.DataFrame:
+    hashed = add_hash_columns(df, source_system, hash_encoding, payload_hash_algorithm)
+    payload_columns = [
+        pl.when(pl.col(col) == "").then(None).otherwise(pl.col(col)).alias(col)
+        if hashed.schema[col] == pl.String
+        else pl.col(col)
+        for col in SOURCE_COLUMNS
+    ]
+
+    return hashed.select(
+        pl.lit(process_id).alias("process_id"),
+        pl.lit(source_hash).alias("source_hash"),
+        pl.lit(source_system).alias("source_system"),
+        pl.col("transaction_id"),
+        pl.col("payload_hash"),
+        *payload_columns,
+        pl.col(SOURCE_ROW_COLUMN).cast(pl.Int64).alias("source_row"),
+    ).rename(dict(zip(SOURCE_COLUMNS, COPY_COLUMNS[5:])))
+
 
+def date_mapping(texts: pl.Series) -> pl.DataFrame:
+    # Como expresión, strptime devuelve nulos si no infiere un formato; sobre la Series falla.
+    return pl.DataFrame({"text": texts}).with_columns(
+        pl.col("text").str.strptime(pl.Datetime, strict=False, exact=False).alias("parsed")
+    )
+
+
+def parse_date_column(values: pl.Series, date_memo: DateParseMemo | None = None) -> pl.Series:
+    # Parquet con fechas tipadas no pasa por texto; solo se unifica la precisión. Las que tienen
+    # zona horaria llegan como texto salvo con --allow-tz-aware-dates (ver scan_input_file).
+    if isinstance(values.dtype, pl.Datetime):
+        return values.dt.cast_time_unit("us")
+
+    # Un archivo trae pocos miles de fechas distintas: se parsean solo los valores únicos en
+    # orden de aparición, así strptime infiere el formato del mismo primer valor que antes.
+    texts = values.cast(pl.Utf8)
+    uniques = texts.unique(maintain_order=True).drop_nulls()
+    mapping = date_memo.resolve(uniques) if date_memo is not None else date_mapping(uniques)
+    return texts.replace_strict(
+        mapping.get_column("text"),
+        mapping.get_column("parsed"),
+        default=None,
+        return_dtype=mapping.schema["parsed"],
+    )
+
+
+def cast_chunk(
+    df: pl.DataFrame,
+    row_offset: int = 0,
+    date_memo: DateParseMemo | None = None,
+) -> pl.DataFrame:
+    # Los bloques de scan_input_file ya traen la fila de origen; row_offset aplica a
+    # DataFrames sin numerar.
+    if SOURCE_ROW_COLUMN not in df.columns:
+        df = df.with_row_index(SOURCE_ROW_COLUMN, offset=row_offset)
+
+    typed = df.select([SOURCE_ROW_COLUMN, *SOURCE_COLUMNS]).with_columns([
+        pl.col(col).cast(dtype, strict=False)
+        for col, dtype in SOURCE_DTYPES.items()
+        if dtype != pl.String
+    ])
+    return typed.with_columns(
+        parse_date_column(typed.get_column(date_col), date_memo) for date_col in DATE_COLUMNS
+    )
+
+
+def transform_chunk(
+    df: pl.DataFrame,
+    row_offset: int = 0,
+    date_memo: DateParseMemo | None = None,
+    rules: list[dict] = DEFAULT_VALIDATION_RULES,
+) -> pl.DataFrame:
+    transformed, _ = split_rejected(cast_chunk(df, row_offset, date_memo), rules)
     return transformed
 
 
-def copy_to_staging(conn: psycopg.Connection, rows: list[list[object]]) -> None:
-    if not rows:
-        return
+def session_time_zone(conn: psycopg.Connection) -> str:
+    return getattr(conn.info.timezone, "key", "UTC")
+
+
+def serialize_copy_frame(frame: pl.DataFrame, copy_format: str, time_zone: str) -> memoryview:
+    # Con --hash-encoding raw los hashes llegan como digest de 32 bytes (BYTEA).
+    bytea_columns = [name for name, dtype in frame.schema.items() if dtype == pl.Binary]
+    if copy_format == "binary":
+        return encode_binary_copy(frame, {**COPY_COLUMN_TYPES, **dict.fromkeys(bytea_columns, "bytea")}, time_zone)
+
+    buffer = io.BytesIO()
+    frame.with_columns(
+        pl.concat_str(pl.lit("\\x"), pl.col(name).bin.encode("hex")).alias(name) for name in bytea_columns
+    ).write_csv(buffer, include_header=False)
+    return buffer.getbuffer()
 
-    buffer = io.StringIO()
-    writer = csv.writer(buffer, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
-    writer.writerows(rows)
-    buffer.seek(0)
 
+def copy_payload(
+    conn: psycopg.Connection,
+    payload: memoryview,
+    copy_format: str,
+    table: str = STAGING_TABLE,
+) -> None:
     copy_sql = f"""
-        COPY staging_transactions ({", ".join(COPY_COLUMNS)})
-        FROM STDIN WITH (FORMAT CSV)
+        COPY {table} ({", ".join(COPY_COLUMNS)})
+        FROM STDIN WITH (FORMAT {copy_format.upper()})
     """
     with conn.cursor() as cursor:
         with cursor.copy(copy_sql) as copy:
-            copy.write(buffer.read())
+            for start in range(0, len(payload), COPY_WRITE_SIZE):
+                copy.write(payload[start:start + COPY_WRITE_SIZE])
+
+
+def staging_partitioned(conn: psycopg.Connection) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", (STAGING_TABLE,))
+        row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def staging_targets(frame: pl.DataFrame, partitioned: bool) -> list[tuple[str, pl.DataFrame]]:
+    if not partitioned:
+        return [(STAGING_TABLE, frame)]
+
+    # Mismo criterio que 009_partition_by_transaction_id.sql: primer dígito hexadecimal de
+    # transaction_id. El COPY va directo a la partición y PostgreSQL no enruta fila por fila.
+    leading_digit = hex_columns(frame).get_column("transaction_id").str.slice(0, 1).str.to_integer(base=16)
+    buckets = frame.with_columns(leading_digit.alias(PARTITION_COLUMN)).partition_by(
+        PARTITION_COLUMN,
+        as_dict=True,
+        include_key=False,
+    )
+    return [(f"{STAGING_TABLE}_p{digit}", bucket) for (digit,), bucket in sorted(buckets.items())]
+
+
+def copy_to_staging(
+    conn: psycopg.Connection,
+    frame: pl.DataFrame,
+    copy_format: str = "csv",
+    partitioned: bool = False,
+) -> None:
+    if frame.height == 0:
+        return
+
+    time_zone = session_time_zone(conn)
+    for table, bucket in staging_targets(frame, partitioned):
+        with serialize_copy_frame(bucket, copy_format, time_zone) as payload:
+            copy_payload(conn, payload, copy_format, table)
+
+
+def parse_csv_dtype(name: str) -> pl.DataType:
+    decimal = re.fullmatch(r"Decimal\((\d+),\s*(\d+)\)", name.strip())
+    if decimal:
+        return pl.Decimal(int(decimal[1]), int(decimal[2]))
+    if name in CSV_SCHEMA_DTYPES:
+        return CSV_SCHEMA_DTYPES[name]
+
+    raise ValueError(f"Tipo no soportado en el esquema CSV: {name}. Use {', '.join(CSV_SCHEMA_DTYPES)} o Decimal(p,s)")
 
 
-def scan_input_file(input_path: Path) -> pl.LazyFrame:
+def load_csv_schema(schema_path: Path) -> dict[str, pl.DataType]:
+    overrides = json.loads(schema_path.read_text(encoding="utf-8"))
+    unknown = sorted(set(overrides) - set(SOURCE_COLUMNS))
+    if unknown:
+        raise ValueError(f"Columnas desconocidas en el esquema CSV {schema_path}: {', '.join(unknown)}")
+
+    return {column: parse_csv_dtype(name) for column, name in overrides.items()}
+
+
+def csv_schema(input_path: Path, overrides: dict[str, pl.DataType]) -> dict[str, pl.DataType]:
+    # El valor canónico (y con él transaction_id y payload_hash) sale del tipo inferido más el
+    # cast: "00123" inferido entero queda 123, "3.0" decimal carga 3 y un Valor decimal se
+    # redondea desde Float64. Por eso las columnas de origen se leen con el tipo inferido de
+    # las primeras filas y solo las que no son de origen van como texto sin convertir. Los
+    # tipos de --csv-schema se respetan tal cual.
+    inferred = pl.scan_csv(
+        input_path.as_posix(),
+        has_header=True,
+        infer_schema_length=CSV_INFER_SCHEMA_LENGTH,
+    ).collect_schema()
+    schema = {}
+    for column, dtype in inferred.items():
+        if column in overrides:
+            schema[column] = overrides[column]
+        elif column in SOURCE_DTYPES:
+            schema[column] = dtype
+        else:
+            schema[column] = pl.String
+    return schema
+
+
+def open_input_file(input_path: Path, csv_overrides: dict[str, pl.DataType] | None = None) -> pl.LazyFrame:
     extension = input_path.suffix.lower()
 
     if extension == ".parquet":
         return pl.scan_parquet(input_path.as_posix())
 
+    if extension == ".csv" and csv_overrides is not None:
+        # Como con la inferencia, un valor que no convierte al tipo de su columna hace fallar la
+        # lectura: volverlo nulo cargaría en silencio, p. ej. una llave de negocio incompleta.
+        return pl.scan_csv(
+            input_path.as_posix(),
+            has_header=True,
+            schema=csv_schema(input_path, csv_overrides),
+            ignore_errors=False,
+        )
+
     if extension == ".csv":
         return pl.scan_csv(
             input_path.as_posix(),
             has_header=True,
-            infer_schema_length=10000,
+            infer_schema_length=CSV_INFER_SCHEMA_LENGTH,
             ignore_errors=False,
         )
 
@@ -239,43 +597,636 @@ def scan_input_file(input_path: Path) -> pl.LazyFrame:
     )
 
 
-def run_etl(
+def pushes_null_filter(input_path: Path, filter_nulls: bool) -> bool:
+    # Solo en Parquet: el total de filas sale de los metadatos y las descartadas al final del
+    # archivo se cuentan sin releerlo. El CSV tokeniza todas las filas igual, así que las que
+    # tienen nulos siguen en el stream y la validación las rechaza con la misma regla.
+    return filter_nulls and input_path.suffix.lower() == ".parquet"
+
+
+def scan_input_file(
     input_path: Path,
+    csv_overrides: dict[str, pl.DataType] | None = None,
+    filter_nulls: bool = True,
+    tz_aware_dates: bool = False,
+) -> pl.LazyFrame:
+    # La proyección y el filtro de nulos quedan en el plan: Parquet solo decodifica las
+    # columnas de origen y el CSV no convierte el resto. __source_row se numera antes del
+    # filtro para conservar la fila del archivo y contar como leídas las filas descartadas.
+    lazy_frame = (
+        open_input_file(input_path, csv_overrides or {})
+        .with_row_index(SOURCE_ROW_COLUMN)
+        .select([SOURCE_ROW_COLUMN, *SOURCE_COLUMNS])
+    )
+    if not tz_aware_dates:
+        lazy_frame = lazy_frame.with_columns(legacy_tz_aware_dates(lazy_frame.collect_schema()))
+    if not pushes_null_filter(input_path, filter_nulls):
+        return lazy_frame
+    return lazy_frame.filter(pl.all_horizontal(pl.col(CRITICAL_COLUMNS).is_not_null()))
+
+
+def legacy_tz_aware_dates(schema: pl.Schema) -> list[pl.Expr]:
+    # Las fechas Datetime con zona horaria pasan por texto como antes y casi siempre quedan
+    # NULL. FechaConstitucion es parte de la llave de negocio: cargarlas con su valor cambia
+    # transaction_id, así que solo se hace con --allow-tz-aware-dates.
+    return [
+        pl.col(name).cast(pl.String)
+        for name in DATE_COLUMNS
+        if isinstance(schema[name], pl.Datetime) and schema[name].time_zone is not None
+    ]
+
+
+def parquet_row_count(input_path: Path) -> int:
+    return pq.ParquetFile(input_path).metadata.num_rows
+
+
+def iter_chunks(lazy_frame: pl.LazyFrame, chunk_size: int) -> Iterator[pl.DataFrame]:
+    pending: list[pl.DataFrame] = []
+    pending_rows = 0
+
+    for batch in lazy_frame.collect_batches(chunk_size=chunk_size, engine="streaming"):
+        pending.append(batch)
+        pending_rows += batch.height
+
+        while pending_rows >= chunk_size:
+            buffered = pl.concat(pending, rechunk=False) if len(pending) > 1 else pending[0]
+            yield buffered.slice(0, chunk_size)
+
+            remainder = buffered.slice(chunk_size)
+            pending = [remainder] if remainder.height else []
+            pending_rows = remainder.height
+
+    if pending_rows:
+        yield pl.concat(pending, rechunk=False) if len(pending) > 1 else pending[0]
+
+
+def prepare_load_task(
+    chunk: pl.DataFrame,
+    row_offset: int,
     process_id: str,
     source_hash: str,
     source_system: str,
-    connection_string: str,
+    reference: pl.DataFrame | HashIndex | None = None,
+    hash_encoding: str = "hex",
+    payload_hash_algorithm: str = "sha256",
+    rows_read: int | None = None,
+    date_memo: DateParseMemo | None = None,
+    rules: list[dict] = DEFAULT_VALIDATION_RULES,
+    quarantine: bool = False,
+) -> LoadTask:
+    rows_read = chunk.height if rows_read is None else rows_read
+    transformed, rejected = split_rejected(cast_chunk(chunk, row_offset, date_memo), rules)
+    rejects = reject_counts(rejected)
+    # Las filas que el filtro de nulos de scan_input_file ya descartó incumplen la misma regla.
+    if rows_read > chunk.height:
+        rejects[REQUIRED_RULE] = rejects.get(REQUIRED_RULE, 0) + rows_read - chunk.height
+
+    frame = build_copy_frame(transformed, process_id, source_hash, source_system, hash_encoding, payload_hash_algorithm)
+
+    unchanged_keys = None
+    if reference is not None:
+        frame, unchanged_keys = split_unchanged(frame, reference)
+
+    return LoadTask(
+        rows_read,
+        frame.height,
+        row_offset,
+        frame=frame,
+        rows_unchanged=0 if unchanged_keys is None else unchanged_keys.height,
+        unchanged_keys=unchanged_keys,
+        rejects=rejects,
+        rejected=quarantine_frame(rejected) if quarantine and rejected.height else None,
+    )
+
+
+def quarantine_frame(rejected: pl.DataFrame) -> pl.DataFrame:
+    return rejected.select(
+        pl.col(SOURCE_ROW_COLUMN).cast(pl.Int64).alias("source_row"),
+        pl.col(REJECT_REASON_COLUMN).alias("reject_reason"),
+        *SOURCE_COLUMNS,
+    )
+
+
+def load_delta_reference(delta_source: str, reference_path: Path, source_system: str) -> pl.DataFrame | HashIndex:
+    if delta_source == "index":
+        return HashIndex.open(reference_path, source_system)
+    return load_snapshot(reference_path)
+
+
+# Referencia de hashes de producción cargada una vez por proceso del pool (ver init_pool_process).
+POOL_REFERENCE: pl.DataFrame | HashIndex | None = None
+POOL_DATE_MEMO: DateParseMemo | None = None
+POOL_VALIDATION_RULES: list[dict] = DEFAULT_VALIDATION_RULES
+POOL_QUARANTINE = False
+
+
+def init_pool_process(
+    delta_source: str | None,
+    reference_path: str,
+    source_system: str,
+    date_memo: bool = False,
+    rules: list[dict] = DEFAULT_VALIDATION_RULES,
+    quarantine: bool = False,
+) -> None:
+    global POOL_REFERENCE, POOL_DATE_MEMO, POOL_VALIDATION_RULES, POOL_QUARANTINE
+    POOL_VALIDATION_RULES = rules
+    POOL_QUARANTINE = quarantine
+    if date_memo:
+        POOL_DATE_MEMO = DateParseMemo()
+    if delta_source:
+        POOL_REFERENCE = load_delta_reference(delta_source, Path(reference_path), source_system)
+
+
+def prepare_copy_payload(
+    ipc_chunk: bytes,
+    row_offset: int,
+    rows_read: int,
+    process_id: str,
+    source_hash: str,
+    source_system: str,
+    copy_format: str,
+    time_zone: str,
+    hash_encoding: str,
+    payload_hash_algorithm: str,
+    partitioned: bool,
+) -> LoadTask:
+    started = time.perf_counter()
+    chunk = pl.read_ipc(io.BytesIO(ipc_chunk))
+    task = prepare_load_task(
+        chunk,
+        row_offset,
+        process_id,
+        source_hash,
+        source_system,
+        POOL_REFERENCE,
+        hash_encoding,
+        payload_hash_algorithm,
+        rows_read,
+        POOL_DATE_MEMO,
+        POOL_VALIDATION_RULES,
+        POOL_QUARANTINE,
+    )
+
+    payloads = []
+    if task.rows_loaded:
+        for table, bucket in staging_targets(task.frame, partitioned):
+            with serialize_copy_frame(bucket, copy_format, time_zone) as serialized:
+                payloads.append((table, bytes(serialized)))
+
+    return LoadTask(
+        task.rows_read,
+        task.rows_loaded,
+        row_offset,
+        payloads=payloads,
+        prepare_seconds=time.perf_counter() - started,
+        rows_unchanged=task.rows_unchanged,
+        unchanged_keys=task.unchanged_keys,
+        rejects=task.rejects,
+        rejected=task.rejected,
+    )
+
+
+def prepare_checkpoints(
+    conn: psycopg.Connection,
+    process_id: str,
     chunk_size: int,
-) -> Metrics:
-    metrics = Metrics()
-    lazy_frame = scan_input_file(input_path)
+    resume: bool,
+    quarantine: bool = False,
+) -> dict[int, tuple[int, int, int, dict[str, int]]]:
+    with conn.cursor() as cursor:
+        if resume:
+            cursor.execute(
+                """
+                SELECT chunk_index, chunk_size, rows_read, rows_loaded, rows_unchanged, rows_rejected_by_rule,
+                       quarantine
+                FROM etl_checkpoints
+                WHERE process_id = %s
+                """,
+                (process_id,),
+            )
+            rows = cursor.fetchall()
+            if rows:
+                chunk_sizes = {row[1] for row in rows}
+                if chunk_sizes != {chunk_size}:
+                    raise ValueError(
+                        f"Los checkpoints del proceso {process_id} usan chunk-size "
+                        f"{sorted(chunk_sizes)}; reanude con el mismo --chunk-size o ejecute sin --resume"
+                    )
+                # La cuarentena desactiva el filtro de nulos de la lectura (en Parquet cambian los
+                # límites de los bloques) y sus archivos deben cubrir todos los bloques confirmados.
+                quarantine_modes = {row[6] for row in rows}
+                if quarantine_modes != {quarantine}:
+                    raise ValueError(
+                        f"Los checkpoints del proceso {process_id} se registraron "
+                        f"{'sin' if quarantine else 'con'} --quarantine-path; reanude con la cuarentena "
+                        "activada o desactivada igual que en la ejecución anterior o ejecute sin --resume"
+                    )
+                return {
+                    chunk_index: (rows_read, rows_loaded, rows_unchanged, rejects)
+                    for chunk_index, _, rows_read, rows_loaded, rows_unchanged, rejects, _ in rows
+                }
+
+        cursor.execute("DELETE FROM staging_transactions WHERE process_id = %s", (process_id,))
+        cursor.execute("DELETE FROM etl_checkpoints WHERE process_id = %s", (process_id,))
+
+    conn.commit()
+    return {}
 
+
+def record_checkpoint(
+    conn: psycopg.Connection,
+    process_id: str,
+    chunk_size: int,
+    task: LoadTask,
+    quarantine: bool = False,
+) -> None:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO etl_checkpoints (
+                process_id, chunk_index, chunk_size, row_offset, rows_read, rows_loaded, rows_unchanged,
+                rows_rejected_by_rule, quarantine
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                process_id,
+                task.row_offset // chunk_size,
+                chunk_size,
+                task.row_offset,
+                task.rows_read,
+                task.rows_loaded,
+                task.rows_unchanged,
+                Jsonb(task.rejects),
+                quarantine,
+            ),
+        )
+
+
+def read_stage(
+    pipeline: Pipeline,
+    stats: StageStats,
+    lazy_frame: pl.LazyFrame,
+    chunk_size: int,
+    committed: dict[int, tuple[int, int, int, dict[str, int]]],
+    output: queue.Queue,
+) -> None:
+    chunks = iter_chunks(lazy_frame, chunk_size)
+    row_offset = 0
+
+    # row_offset cuenta filas del archivo, no filas conservadas: cada bloque se queda con
+    # las filas descartadas por el filtro de nulos que lo preceden.
+    while pipeline.acquire_slot(stats):
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        stats.busy_seconds += time.perf_counter() - started
+
+        if chunk is None:
+            pipeline.release_slot()
+            pipeline.put(output, END_OF_STREAM, stats)
+            return
+
+        rows_read = chunk.get_column(SOURCE_ROW_COLUMN)[-1] + 1 - row_offset
+        if row_offset // chunk_size in committed:
+            pipeline.release_slot()
+            row_offset += rows_read
+            continue
+
+        stats.chunks += 1
+        if not pipeline.put(output, (row_offset, rows_read, chunk), stats):
+            return
+        row_offset += rows_read
+
+
+def transform_stage(
+    pipeline: Pipeline,
+    stats: StageStats,
+    source: queue.Queue,
+    output: queue.Queue,
+    process_id: str,
+    source_hash: str,
+    source_system: str,
+    reference: pl.DataFrame | HashIndex | None,
+    hash_encoding: str,
+    payload_hash_algorithm: str,
+    date_memo: DateParseMemo | None,
+    rules: list[dict],
+    quarantine: bool,
+    loaders: int,
+) -> None:
+    while True:
+        item = pipeline.get(source, stats)
+        if item is END_OF_STREAM:
+            for _ in range(loaders):
+                pipeline.put(output, END_OF_STREAM, stats)
+            return
+
+        row_offset, rows_read, chunk = item
+        started = time.perf_counter()
+        task = prepare_load_task(
+            chunk,
+            row_offset,
+            process_id,
+            source_hash,
+            source_system,
+            reference,
+            hash_encoding,
+            payload_hash_algorithm,
+            rows_read,
+            date_memo,
+            rules,
+            quarantine,
+        )
+        stats.busy_seconds += time.perf_counter() - started
+
+        stats.chunks += 1
+        if not pipeline.put(output, task, stats):
+            return
+
+
+def submit_stage(
+    pipeline: Pipeline,
+    stats: StageStats,
+    source: queue.Queue,
+    output: queue.Queue,
+    executor: ProcessPoolExecutor,
+    pool_stats: StageStats,
+    preserve_order: bool,
+    process_id: str,
+    source_hash: str,
+    source_system: str,
+    copy_format: str,
+    time_zone: str,
+    hash_encoding: str,
+    payload_hash_algorithm: str,
+    partitioned: bool,
+    loaders: int,
+) -> None:
+    pending: set[Future] = set()
+    undelivered = 0
+    delivered = threading.Condition()
+
+    def record_prepared(future: Future) -> None:
+        pending.discard(future)
+        if not future.cancelled() and future.exception() is None:
+            pool_stats.busy_seconds += future.result().prepare_seconds
+            pool_stats.chunks += 1
+
+    def deliver(future: Future) -> None:
+        nonlocal undelivered
+        output.put(future)
+        with delivered:
+            undelivered -= 1
+            delivered.notify_all()
+
+    while True:
+        item = pipeline.get(source, stats)
+        if item is END_OF_STREAM:
+            break
+
+        row_offset, rows_read, chunk = item
+        started = time.perf_counter()
+        ipc_chunk = io.BytesIO()
+        chunk.write_ipc(ipc_chunk)
+        future = executor.submit(
+            prepare_copy_payload,
+            ipc_chunk.getvalue(),
+            row_offset,
+            rows_read,
+            process_id,
+            source_hash,
+            source_system,
+            copy_format,
+            time_zone,
+            hash_encoding,
+            payload_hash_algorithm,
+            partitioned,
+        )
+        stats.busy_seconds += time.perf_counter() - started
+        stats.chunks += 1
+
+        pending.add(future)
+        future.add_done_callback(record_prepared)
+        if preserve_order:
+            if not pipeline.put(output, future, stats):
+                return
+        else:
+            with delivered:
+                undelivered += 1
+            future.add_done_callback(deliver)
+
+    if pipeline.stop.is_set():
+        return
+
+    # wait() retorna antes de que corran los callbacks de los futures: el fin de flujo solo
+    # se envía cuando cada bloque ya está en la cola, o los loaders saldrían sin cargarlo.
+    wait(list(pending))
+    with delivered:
+        while undelivered and not pipeline.stop.is_set():
+            delivered.wait(QUEUE_POLL_SECONDS)
+    if pipeline.stop.is_set():
+        return
+
+    for _ in range(loaders):
+        pipeline.put(output, END_OF_STREAM, stats)
+
+
+def load_stage(
+    pipeline: Pipeline,
+    stats: StageStats,
+    source: queue.Queue,
+    connection_string: str,
+    copy_format: str,
+    process_id: str,
+    chunk_size: int,
+    tracker: ProgressTracker,
+    partitioned: bool,
+    quarantine: QuarantineWriter | None,
+) -> None:
     with psycopg.connect(connection_string, autocommit=False) as conn:
-        offset = 0
         while True:
-            chunk = lazy_frame.slice(offset, chunk_size).collect(engine="streaming")
-            if chunk.height == 0:
-                break
+            task = pipeline.get(source, stats)
+            if task is END_OF_STREAM:
+                return
 
-            metrics.rows_read += chunk.height
-            transformed = transform_chunk(chunk)
-            rows = build_copy_rows(transformed, process_id, source_hash, source_system)
-            copy_to_staging(conn, rows)
+            if isinstance(task, Future):
+                waiting = time.perf_counter()
+                task = task.result()
+                stats.idle_seconds += time.perf_counter() - waiting
 
-            metrics.rows_loaded += len(rows)
-            metrics.rows_rejected += chunk.height - len(rows)
+            started = time.perf_counter()
+            # Los rechazos quedan en disco antes del COMMIT del bloque; si el bloque no llega a
+            # confirmarse, al reanudar se vuelve a escribir el mismo archivo.
+            if quarantine is not None:
+                quarantine.write(task.row_offset // chunk_size, task.rejected)
+            if task.payloads is not None:
+                for table, payload in task.payloads:
+                    copy_payload(conn, memoryview(payload), copy_format, table)
+            else:
+                copy_to_staging(conn, task.frame, copy_format, partitioned)
+            record_checkpoint(conn, process_id, chunk_size, task, quarantine is not None)
             conn.commit()
+            stats.busy_seconds += time.perf_counter() - started
 
-            print(
-                f"PROGRESS rows_read={metrics.rows_read} "
-                f"rows_loaded={metrics.rows_loaded} "
-                f"rows_rejected={metrics.rows_rejected}",
-                flush=True,
+            stats.chunks += 1
+            if task.unchanged_keys is not None:
+                tracker.keep_unchanged(task.unchanged_keys)
+            tracker.record(task.rows_read, task.rows_loaded, task.rows_unchanged, task.rejects)
+            pipeline.release_slot()
+
+
+def run_etl(
+    input_path: Path,
+    process_id: str,
+    source_hash: str,
+    source_system: str,
+    connection_string: str,
+    chunk_size: int,
+    copy_format: str = "csv",
+    workers: int = 1,
+    max_in_flight: int = 0,
+    transform_processes: int = 0,
+    preserve_order: bool = False,
+    resume: bool = False,
+    delta: bool = False,
+    snapshot_path: Path | None = None,
+    delta_source: str = "snapshot",
+    index_dir: Path | None = None,
+    hash_encoding: str = "hex",
+    payload_hash_algorithm: str = "sha256",
+    allow_payload_hash_change: bool = False,
+    csv_schema_path: Path | None = None,
+    date_memo: bool = False,
+    validation_rules_path: Path | None = None,
+    quarantine_path: Path | None = None,
+    allow_tz_aware_dates: bool = False,
+) -> Metrics:
+    # Falla antes de tocar la base si falta el paquete opcional del algoritmo.
+    digest_function(payload_hash_algorithm)
+    tracker = ProgressTracker()
+    csv_overrides = load_csv_schema(csv_schema_path) if csv_schema_path else {}
+    rules = (
+        load_rules(validation_rules_path, DEFAULT_VALIDATION_RULES, SOURCE_COLUMNS)
+        if validation_rules_path
+        else DEFAULT_VALIDATION_RULES
+    )
+    # Con cuarentena las filas con nulos deben llegar a la validación para escribirlas.
+    lazy_frame = scan_input_file(
+        input_path,
+        csv_overrides,
+        filter_nulls=quarantine_path is None,
+        tz_aware_dates=allow_tz_aware_dates,
+    )
+    pipeline = Pipeline(max_in_flight or workers + transform_processes + 2)
+    chunks: queue.Queue = queue.Queue()
+    tasks: queue.Queue = queue.Queue()
+
+    # En modo delta las llaves omitidas de bloques ya confirmados no se conservan entre
+    # ejecuciones, por lo que --resume reinicia el proceso en lugar de reanudarlo.
+    with psycopg.connect(connection_string, autocommit=False) as conn:
+        check_hash_encoding(conn, hash_encoding)
+        check_payload_hash_algorithm(conn, source_system, payload_hash_algorithm, allow_payload_hash_change)
+        committed = prepare_checkpoints(conn, process_id, chunk_size, resume and not delta, quarantine_path is not None)
+        time_zone = session_time_zone(conn)
+        partitioned = staging_partitioned(conn)
+        if delta and delta_source == "index":
+            reference_path = prepare_index(conn, index_dir or INDEX_DIR, source_system, hash_encoding)
+        elif delta:
+            reference_path = snapshot_path or default_snapshot_path(source_system)
+            refresh_snapshot(conn, source_system, reference_path, hash_encoding)
+    tracker.restore(committed)
+    quarantine = QuarantineWriter(quarantine_path, resume=bool(committed)) if quarantine_path else None
+
+    pipeline.spawn("read", read_stage, lazy_frame, chunk_size, committed, chunks)
+    for _ in range(workers):
+        pipeline.spawn(
+            "load",
+            load_stage,
+            tasks,
+            connection_string,
+            copy_format,
+            process_id,
+            chunk_size,
+            tracker,
+            partitioned,
+            quarantine,
+        )
+
+    try:
+        if transform_processes > 0:
+            executor = ProcessPoolExecutor(
+                max_workers=transform_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_pool_process,
+                initargs=(
+                    delta_source if delta else None,
+                    str(reference_path) if delta else "",
+                    source_system,
+                    date_memo,
+                    rules,
+                    quarantine is not None,
+                ),
             )
+            try:
+                pipeline.spawn(
+                    "transform",
+                    submit_stage,
+                    chunks,
+                    tasks,
+                    executor,
+                    pipeline.stage_stats("transform-pool", transform_processes),
+                    preserve_order,
+                    process_id,
+                    source_hash,
+                    source_system,
+                    copy_format,
+                    time_zone,
+                    hash_encoding,
+                    payload_hash_algorithm,
+                    partitioned,
+                    workers,
+                )
+                pipeline.join()
+            finally:
+                executor.shutdown(cancel_futures=True)
+        else:
+            reference = load_delta_reference(delta_source, reference_path, source_system) if delta else None
+            pipeline.spawn(
+                "transform",
+                transform_stage,
+                chunks,
+                tasks,
+                process_id,
+                source_hash,
+                source_system,
+                reference,
+                hash_encoding,
+                payload_hash_algorithm,
+                DateParseMemo() if date_memo else None,
+                rules,
+                quarantine is not None,
+                workers,
+            )
+            pipeline.join()
+    finally:
+        # Los archivos de cuarentena ya están completos; también se reportan si el ETL falla.
+        if quarantine is not None:
+            tracker.metrics.quarantine_path = quarantine.close()
+
+    # Filas descartadas por el filtro de nulos después del último bloque conservado.
+    if pushes_null_filter(input_path, quarantine_path is None):
+        trailing_rows = parquet_row_count(input_path) - tracker.metrics.rows_read
+        if trailing_rows:
+            tracker.record(trailing_rows, 0, 0, {REQUIRED_RULE: trailing_rows})
 
-            offset += chunk_size
+    if delta:
+        with psycopg.connect(connection_string, autocommit=False) as conn:
+            tracker.supersede(reconcile_unchanged(conn, process_id, tracker.unchanged_keys, hash_encoding))
+            if delta_source == "index":
+                write_pending(conn, reference_path, source_system, process_id, hash_encoding)
 
-    return metrics
+    tracker.metrics.stages = pipeline.report()
+    return tracker.metrics
 
 
 def main() -> None:
@@ -286,10 +1237,103 @@ def main() -> None:
     parser.add_argument("--source-system", default="ExternalProvider", help="Sistema origen")
     parser.add_argument("--source-hash", default="", help="Hash SHA-256 del archivo")
     parser.add_argument("--chunk-size", type=int, default=200000, help="Tamaño de bloque para procesar")
+    parser.add_argument("--copy-format", choices=COPY_FORMATS, default="csv", help="Formato de COPY hacia staging")
+    parser.add_argument("--workers", type=int, default=1, help="Conexiones concurrentes de COPY hacia staging")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=0,
+        help="Máximo de bloques en memoria entre lectura y COPY (0 = workers + transform-processes + 2)",
+    )
+    parser.add_argument(
+        "--transform-processes",
+        type=int,
+        default=0,
+        help="Procesos para transformación y hashes (0 = en el mismo proceso)",
+    )
+    parser.add_argument(
+        "--preserve-order",
+        action="store_true",
+        help="Entregar los bloques al COPY en el orden del archivo al usar --transform-processes",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reanudar desde los bloques ya confirmados del mismo process-id",
+    )
+    parser.add_argument(
+        "--hash-cache",
+        default=str(DEFAULT_CACHE_PATH),
+        help="Caché de hashes por (ruta, tamaño, mtime, inode) compartida con la API; vacío para desactivarla",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Omitir filas cuyo (transaction_id, payload_hash) ya existe en producción",
+    )
+    parser.add_argument(
+        "--snapshot-cache",
+        default="",
+        help="Parquet local con el snapshot de hashes de producción (por defecto .cache/hash_snapshots/<source-system>.parquet)",
+    )
+    parser.add_argument(
+        "--delta-source",
+        choices=DELTA_SOURCES,
+        default="snapshot",
+        help="Origen de los hashes de producción en modo delta: snapshot descargado o índice local",
+    )
+    parser.add_argument(
+        "--hash-index-dir",
+        default=str(INDEX_DIR),
+        help="Directorio del índice local de hashes (--delta-source index)",
+    )
+    parser.add_argument(
+        "--hash-encoding",
+        choices=HASH_ENCODINGS,
+        default="hex",
+        help="Formato de transaction_id y payload_hash: hex (CHAR(64)) o raw (BYTEA de 32 bytes, ver 007_hash_bytea.sql)",
+    )
+    parser.add_argument(
+        "--payload-hash-algorithm",
+        choices=PAYLOAD_HASH_ALGORITHMS,
+        default="sha256",
+        help="Algoritmo de payload_hash (xxh3_128 requiere xxhash y blake3 el paquete blake3); transaction_id siempre es SHA-256",
+    )
+    parser.add_argument(
+        "--allow-payload-hash-change",
+        action="store_true",
+        help="Permitir un algoritmo distinto al del último proceso completado (todas las filas se recalculan en el merge)",
+    )
+    parser.add_argument(
+        "--csv-schema",
+        default="",
+        help='JSON con tipos por columna que reemplazan los declarados para CSV, p. ej. {"Valor": "Float64"}',
+    )
+    parser.add_argument(
+        "--date-memo",
+        action="store_true",
+        help="Conservar entre bloques las fechas ya parseadas y parsear solo textos nuevos",
+    )
+    parser.add_argument(
+        "--validation-rules",
+        default="",
+        help="JSON con reglas de validación adicionales (range, enum, order, not_null), ver validation_rules.json",
+    )
+    parser.add_argument(
+        "--quarantine-path",
+        default="",
+        help="Directorio donde cada ejecución escribe un part-NNNNN.parquet con las filas rechazadas; vacío para desactivarlo",
+    )
+    parser.add_argument(
+        "--allow-tz-aware-dates",
+        action="store_true",
+        help="Cargar con su valor las fechas Parquet con zona horaria, que antes quedaban NULL (cambia transaction_id de esas filas)",
+    )
     args = parser.parse_args()
 
     input_path = Path(args.parquet_path)
-    source_hash = args.source_hash or compute_file_hash(input_path)
+    hash_cache = Path(args.hash_cache) if args.hash_cache else None
+    source_hash = args.source_hash or compute_file_hash(input_path, hash_cache)
 
     metrics = run_etl(
         input_path=input_path,
@@ -298,6 +1342,24 @@ def main() -> None:
         source_system=args.source_system,
         connection_string=args.connection_string,
         chunk_size=args.chunk_size,
+        copy_format=args.copy_format,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        transform_processes=args.transform_processes,
+        preserve_order=args.preserve_order,
+        resume=args.resume,
+        delta=args.delta,
+        snapshot_path=Path(args.snapshot_cache) if args.snapshot_cache else None,
+        delta_source=args.delta_source,
+        index_dir=Path(args.hash_index_dir),
+        hash_encoding=args.hash_encoding,
+        payload_hash_algorithm=args.payload_hash_algorithm,
+        allow_payload_hash_change=args.allow_payload_hash_change,
+        csv_schema_path=Path(args.csv_schema) if args.csv_schema else None,
+        date_memo=args.date_memo,
+        validation_rules_path=Path(args.validation_rules) if args.validation_rules else None,
+        quarantine_path=Path(args.quarantine_path) if args.quarantine_path else None,
+        allow_tz_aware_dates=args.allow_tz_aware_dates,
     )
 
     print(
@@ -308,6 +1370,11 @@ def main() -> None:
                 "rowsRead": metrics.rows_read,
                 "rowsLoaded": metrics.rows_loaded,
                 "rowsRejected": metrics.rows_rejected,
+                "rowsUnchanged": metrics.rows_unchanged,
+                "rowsRejectedByRule": dict(sorted(metrics.rows_rejected_by_rule.items())),
+                "quarantinePath": str(metrics.quarantine_path) if metrics.quarantine_path else None,
+                "payloadHashAlgorithm": args.payload_hash_algorithm,
+                "stages": metrics.stages,
             }
         )
     )
@@ -0,0 +1,92 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 16 * 1024 * 1024
+MTIME_RESOLUTION_NS = 100
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "file_hashes.json"
+
+
+def hash_file_contents(file_path: Path) -> str:
+    hasher = hashlib.sha256()
+    with file_path.open("rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return hasher.hexdigest()
+
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            with memoryview(mapped) as view:
+                for start in range(0, len(view), HASH_BLOCK_SIZE):
+                    hasher.update(view[start:start + HASH_BLOCK_SIZE])
+
+    return hasher.hexdigest()
+
+
+def load_cache(cache_path: Path) -> dict[str, dict]:
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8")).get("entries", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache_path: Path, entries: dict[str, dict]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps({"version": 1, "entries": entries}, indent=2), encoding="utf-8")
+    os.replace(temp_path, cache_path)
+
+
+def entry_matches(entry: dict, stat: os.stat_result) -> bool:
+    # La API .NET no conoce el inode y lo guarda como 0; en ese caso basta tamaño + mtime.
+    return (
+        entry.get("size") == stat.st_size
+        and entry.get("mtimeNs", -1) // MTIME_RESOLUTION_NS == stat.st_mtime_ns // MTIME_RESOLUTION_NS
+        and entry.get("inode", 0) in (0, stat.st_ino)
+        and bool(entry.get("sha256"))
+    )
+
+
+def compute_file_hash(file_path: Path, cache_path: Path | None = None) -> str:
+    if cache_path is None:
+        return hash_file_contents(file_path)
+
+    key = os.path.abspath(file_path)
+    stat = os.stat(key)
+    entry = load_cache(cache_path).get(key)
+    if entry is not None and entry_matches(entry, stat):
+        return entry["sha256"]
+
+    file_hash = hash_file_contents(file_path)
+    if os.stat(key).st_mtime_ns != stat.st_mtime_ns:
+        return file_hash
+
+    entries = load_cache(cache_path)
+    entries[key] = {
+        "size": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+        "sha256": file_hash,
+    }
+    save_cache(cache_path, entries)
+    return file_hash
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SHA-256 de un archivo con caché por (ruta, tamaño, mtime, inode)")
+    parser.add_argument("path", help="Archivo a procesar")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), help="Ruta del archivo de caché de hashes")
+    parser.add_argument("--no-cache", action="store_true", help="Calcular sin consultar ni actualizar la caché")
+    args = parser.parse_args()
+
+    cache_path = None if args.no_cache else Path(args.cache)
+    print(compute_file_hash(Path(args.path), cache_path))
+
+
+if __name__ == "__main__":
+    main()
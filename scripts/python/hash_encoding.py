@@ -0,0 +1,49 @@
+import polars as pl
+import psycopg
+from psycopg import sql
+
+HASH_ENCODINGS = ["hex", "raw"]
+HASH_COLUMNS = ["transaction_id", "payload_hash"]
+
+
+def stored_hash_encoding(conn: psycopg.Connection) -> str:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT format_type(atttypid, atttypmod)
+            FROM pg_attribute
+            WHERE attrelid = to_regclass('transactions') AND attname = 'transaction_id'
+            """
+        )
+        row = cursor.fetchone()
+    return "raw" if row and row[0] == "bytea" else "hex"
+
+
+def check_hash_encoding(conn: psycopg.Connection, hash_encoding: str) -> None:
+    stored = stored_hash_encoding(conn)
+    conn.commit()
+    if stored != hash_encoding:
+        raise ValueError(
+            f"La base guarda los hashes como {stored} y el ETL se ejecutó con --hash-encoding {hash_encoding}; "
+            "use el mismo valor (raw requiere scripts/sql/007_hash_bytea.sql)"
+        )
+
+
+def hex_sql(column: str, hash_encoding: str) -> sql.Composable:
+    # Las comparaciones locales (snapshot, índice) siempre trabajan con el digest en hexadecimal.
+    if hash_encoding == "raw":
+        return sql.SQL("encode({}, 'hex')").format(sql.Identifier(column))
+    return sql.Identifier(column)
+
+
+def hash_params(hex_values: list[str], hash_encoding: str) -> list[str] | list[bytes]:
+    if hash_encoding == "raw":
+        return [bytes.fromhex(value) for value in hex_values]
+    return hex_values
+
+
+def hex_columns(frame: pl.DataFrame) -> pl.DataFrame:
+    return frame.select(
+        pl.col(column).bin.encode("hex") if frame.schema[column] == pl.Binary else pl.col(column)
+        for column in HASH_COLUMNS
+    )
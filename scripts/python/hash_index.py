@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import psycopg
+from psycopg import sql
+
+from file_hash import DEFAULT_CACHE_PATH
+from hash_encoding import hex_sql, stored_hash_encoding
+
+INDEX_DIR = DEFAULT_CACHE_PATH.parent / "hash_index"
+INDEX_RECORD = np.dtype([("tid", "S32"), ("payload", "S32")])
+PAIR_SCHEMA = {"transaction_id": pl.String, "payload_hash": pl.String}
+
+# Checksum por fila: primeros 8 bytes de md5(transaction_id || payload_hash) como BIGINT, combinados
+# con XOR. Se calcula igual en PostgreSQL y en Python, y se actualiza de forma incremental.
+DATABASE_STATE_SQL = """
+    SELECT
+        COUNT(*),
+        COALESCE(BIT_XOR(('x' || LEFT(MD5({} || {}), 16))::BIT(64)::BIGINT), 0)
+    FROM transactions
+    WHERE source_system = %s
+"""
+
+
+def index_paths(index_dir: Path, source_system: str) -> tuple[Path, Path, Path]:
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", source_system)
+    return index_dir / f"{name}.idx", index_dir / f"{name}.json", index_dir / f"{name}.pending"
+
+
+def row_checksum(transaction_id: str, payload_hash: str) -> int:
+    digest = hashlib.md5(f"{transaction_id}{payload_hash}".encode("ascii")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def digest_hex(digest: bytes) -> str:
+    # Los escalares S32 de numpy pierden los bytes nulos finales; se restauran antes de pasar a hex.
+    return digest.ljust(32, b"\x00").hex()
+
+
+def hex_digests(series: pl.Series) -> np.ndarray:
+    if series.len() == 0:
+        return np.empty(0, dtype="S32")
+    return np.frombuffer(bytes.fromhex(series.str.join("").item()), dtype="S32")
+
+
+def to_records(pairs: pl.DataFrame) -> np.ndarray:
+    records = np.empty(pairs.height, dtype=INDEX_RECORD)
+    records["tid"] = hex_digests(pairs.get_column("transaction_id"))
+    records["payload"] = hex_digests(pairs.get_column("payload_hash"))
+    return records
+
+
+def database_state(conn: psycopg.Connection, source_system: str, hash_encoding: str = "hex") -> tuple[int, int]:
+    statement = sql.SQL(DATABASE_STATE_SQL).format(
+        hex_sql("transaction_id", hash_encoding),
+        hex_sql("payload_hash", hash_encoding),
+    )
+    with conn.cursor() as cursor:
+        cursor.execute(statement, (source_system,))
+        rows, checksum = cursor.fetchone()
+    return rows, checksum
+
+
+def copy_to_frame(conn: psycopg.Connection, statement: sql.Composable, schema: dict) -> pl.DataFrame:
+    buffer = io.BytesIO()
+    with conn.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            for block in copy:
+                buffer.write(block)
+    return pl.read_csv(buffer.getvalue(), has_header=False, schema=schema)
+
+
+class HashIndex:
+    def __init__(self, index_path: Path, state_path: Path) -> None:
+        self.index_path = index_path
+        self.state_path = state_path
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        self.rows: int = state["rows"]
+        self.checksum: int = state["checksum"]
+        self.records = (
+            np.memmap(index_path, dtype=INDEX_RECORD, mode="r")
+            if self.rows
+            else np.empty(0, dtype=INDEX_RECORD)
+        )
+
+    @classmethod
+    def open(cls, index_dir: Path, source_system: str) -> "HashIndex | None":
+        index_path, state_path, _ = index_paths(index_dir, source_system)
+        if not index_path.exists() or not state_path.exists():
+            return None
+        return cls(index_path, state_path)
+
+    def lookup(self, tids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if not self.rows:
+            return np.zeros(len(tids), dtype=np.int64), np.zeros(len(tids), dtype=bool)
+
+        positions = np.searchsorted(self.records["tid"], tids)
+        clipped = np.minimum(positions, self.rows - 1)
+        found = (positions < self.rows) & (self.records["tid"][clipped] == tids)
+        return clipped, found
+
+    def unchanged_mask(self, transaction_ids: pl.Series, payload_hashes: pl.Series) -> np.ndarray:
+        positions, found = self.lookup(hex_digests(transaction_ids))
+        if not self.rows:
+            return found
+        return found & (self.records["payload"][positions] == hex_digests(payload_hashes))
+
+
+def write_index(index_dir: Path, source_system: str, records: np.ndarray, checksum: int) -> None:
+    index_path, state_path, _ = index_paths(index_dir, source_system)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    temp_index = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    records.tofile(temp_index)
+    os.replace(temp_index, index_path)
+
+    temp_state = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+    temp_state.write_text(json.dumps({"rows": len(records), "checksum": checksum}), encoding="utf-8")
+    os.replace(temp_state, state_path)
+
+
+def rebuild_index(conn: psycopg.Connection, index_dir: Path, source_system: str, hash_encoding: str = "hex") -> int:
+    # Conteo, checksum y volcado salen de la misma foto de la base (REPEATABLE READ).
+    conn.commit()
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+    try:
+        rows, checksum = database_state(conn, source_system, hash_encoding)
+        pairs = copy_to_frame(
+            conn,
+            sql.SQL(
+                "COPY (SELECT {}, {} FROM transactions WHERE source_system = {}) TO STDOUT WITH (FORMAT CSV)"
+            ).format(
+                hex_sql("transaction_id", hash_encoding),
+                hex_sql("payload_hash", hash_encoding),
+                sql.Literal(source_system),
+            ),
+            PAIR_SCHEMA,
+        )
+        conn.commit()
+    finally:
+        conn.isolation_level = previous_isolation
+
+    records = to_records(pairs.sort("transaction_id"))
+    if len(records) != rows:
+        raise RuntimeError(f"El volcado de {source_system} devolvió {len(records)} filas y el conteo {rows}")
+
+    write_index(index_dir, source_system, records, checksum)
+    return rows
+
+
+def apply_pairs(index_dir: Path, source_system: str, pairs: pl.DataFrame) -> None:
+    index = HashIndex.open(index_dir, source_system)
+    if index is None:
+        return
+
+    pairs = pairs.sort("transaction_id")
+    incoming = to_records(pairs)
+    positions, found = index.lookup(incoming["tid"])
+
+    records = np.array(index.records)
+    checksum = index.checksum
+    for tid, payload, position, exists in zip(
+        pairs.get_column("transaction_id"),
+        pairs.get_column("payload_hash"),
+        positions,
+        found,
+    ):
+        if exists:
+            checksum ^= row_checksum(tid, digest_hex(records["payload"][position]))
+        checksum ^= row_checksum(tid, payload)
+
+    records["payload"][positions[found]] = incoming["payload"][found]
+    if (~found).any():
+        insert_at = np.searchsorted(records["tid"], incoming["tid"][~found])
+        records = np.insert(records, insert_at, incoming[~found])
+
+    del index
+    write_index(index_dir, source_system, records, checksum)
+
+
+def write_pending(
+    conn: psycopg.Connection,
+    index_dir: Path,
+    source_system: str,
+    process_id: str,
+    hash_encoding: str = "hex",
+) -> int:
+    # Filas que el merge aplicará para este proceso: la última por transaction_id en staging.
+    pairs = copy_to_frame(
+        conn,
+        sql.SQL(
+            "COPY (SELECT DISTINCT ON (transaction_id) {}, {} FROM staging_transactions "
+            "WHERE process_id = {} ORDER BY transaction_id, source_row DESC NULLS LAST, staging_id DESC) "
+            "TO STDOUT WITH (FORMAT CSV)"
+        ).format(
+            hex_sql("transaction_id", hash_encoding),
+            hex_sql("payload_hash", hash_encoding),
+            sql.Literal(process_id),
+        ),
+        PAIR_SCHEMA,
+    )
+    conn.commit()
+
+    _, _, pending_dir = index_paths(index_dir, source_system)
+    pending_dir.mkdir(parents=True, exist_ok=True)
+    pairs.write_parquet(pending_dir / f"{process_id}.parquet")
+    return pairs.height
+
+
+def apply_pending(conn: psycopg.Connection, index_dir: Path, source_system: str) -> int:
+    # Un archivo pendiente se aplica solo cuando su proceso quedó Completed (merge confirmado);
+    # los de procesos fallidos o desconocidos se descartan y los en curso se conservan.
+    _, _, pending_dir = index_paths(index_dir, source_system)
+    pending = {path.stem: path for path in pending_dir.glob("*.parquet")} if pending_dir.exists() else {}
+    if not pending:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT process_id::text, status FROM process_control WHERE process_id::text = ANY(%s) "
+            "ORDER BY finished_at NULLS LAST",
+            (list(pending),),
+        )
+        statuses = cursor.fetchall()
+    conn.commit()
+
+    applied = 0
+    known = set()
+    for process_id, status in statuses:
+        known.add(process_id)
+        if status == "Completed":
+            apply_pairs(index_dir, source_system, pl.read_parquet(pending[process_id]))
+            applied += 1
+        if status in ("Completed", "Failed"):
+            pending[process_id].unlink()
+
+    for process_id, path in pending.items():
+        if process_id not in known:
+            path.unlink()
+
+    return applied
+
+
+def verify_index(conn: psycopg.Connection, index_dir: Path, source_system: str, hash_encoding: str = "hex") -> bool:
+    index = HashIndex.open(index_dir, source_system)
+    if index is None:
+        return False
+
+    rows, checksum = database_state(conn, source_system, hash_encoding)
+    conn.commit()
+    return (index.rows, index.checksum) == (rows, checksum)
+
+
+def prepare_index(conn: psycopg.Connection, index_dir: Path, source_system: str, hash_encoding: str = "hex") -> Path:
+    apply_pending(conn, index_dir, source_system)
+    if not verify_index(conn, index_dir, source_system, hash_encoding):
+        rebuild_index(conn, index_dir, source_system, hash_encoding)
+    return index_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Índice local de hashes de producción por source_system")
+    parser.add_argument("command", choices=["verify", "rebuild", "apply"], help="Acción a ejecutar")
+    parser.add_argument("--connection-string", required=True, help="Cadena de conexión de PostgreSQL")
+    parser.add_argument("--source-system", default="ExternalProvider", help="Sistema origen")
+    parser.add_argument("--index-dir", default=str(INDEX_DIR), help="Directorio del índice")
+    args = parser.parse_args()
+
+    index_dir = Path(args.index_dir)
+    with psycopg.connect(args.connection_string, autocommit=False) as conn:
+        hash_encoding = stored_hash_encoding(conn)
+        if args.command == "verify":
+            consistent = verify_index(conn, index_dir, args.source_system, hash_encoding)
+            print("Índice consistente" if consistent else "Índice inconsistente: ejecute rebuild")
+            raise SystemExit(0 if consistent else 1)
+
+        if args.command == "rebuild":
+            rows = rebuild_index(conn, index_dir, args.source_system, hash_encoding)
+            print(f"Índice reconstruido: {rows} filas")
+            return
+
+        applied = apply_pending(conn, index_dir, args.source_system)
+        print(f"Archivos pendientes aplicados: {applied}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Callable
+
+import psycopg
+
+PAYLOAD_HASH_ALGORITHMS = ["sha256", "xxh3_128", "blake3"]
+
+# Todas las columnas de hash son de 32 bytes (CHAR(64) hex o BYTEA); los digests de 128 bits
+# se completan con ceros para conservar el ancho y el formato del snapshot y del índice local.
+DIGEST_SIZE = 32
+
+OPTIONAL_PACKAGES = {"xxh3_128": "xxhash", "blake3": "blake3"}
+
+
+def sha256_digest(value: bytes) -> bytes:
+    return hashlib.sha256(value).digest()
+
+
+def digest_function(algorithm: str) -> Callable[[bytes], bytes]:
+    try:
+        if algorithm == "xxh3_128":
+            import xxhash
+
+            return lambda value: xxhash.xxh3_128_digest(value).ljust(DIGEST_SIZE, b"\x00")
+
+        if algorithm == "blake3":
+            from blake3 import blake3
+
+            return lambda value: blake3(value).digest()
+    except ImportError as exc:
+        raise RuntimeError(
+            f"--payload-hash-algorithm {algorithm} requiere el paquete opcional "
+            f"{OPTIONAL_PACKAGES[algorithm]} (pip install {OPTIONAL_PACKAGES[algorithm]})"
+        ) from exc
+
+    return sha256_digest
+
+
+def recorded_payload_hash_algorithm(conn: psycopg.Connection, source_system: str) -> str | None:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT payload_hash_algorithm
+            FROM process_control
+            WHERE source_system = %s
+              AND status = 'Completed'
+              AND payload_hash_algorithm IS NOT NULL
+            ORDER BY finished_at DESC NULLS LAST
+            LIMIT 1
+            """,
+            (source_system,),
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def check_payload_hash_algorithm(
+    conn: psycopg.Connection,
+    source_system: str,
+    algorithm: str,
+    allow_change: bool,
+) -> None:
+    # Comparar payload_hash de algoritmos distintos marcaría todas las filas como modificadas
+    # sin que nadie lo haya pedido; el cambio de algoritmo se hace de forma explícita.
+    recorded = recorded_payload_hash_algorithm(conn, source_system)
+    conn.commit()
+    if recorded is None or recorded == algorithm or allow_change:
+        return
+
+    raise ValueError(
+        f"Producción guarda payload_hash de {source_system} con {recorded} y el ETL se ejecutó con "
+        f"--payload-hash-algorithm {algorithm}; use --allow-payload-hash-change para recalcular todas las filas"
+    )
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+QUEUE_POLL_SECONDS = 0.5
+
+END_OF_STREAM = object()
+
+
+@dataclass
+class StageStats:
+    busy_seconds: float = 0.0
+    idle_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    chunks: int = 0
+    workers: int = 1
+
+
+class Pipeline:
+    def __init__(self, max_in_flight: int) -> None:
+        self.stop = threading.Event()
+        self.failures: list[BaseException] = []
+        self.stats: dict[str, list[StageStats]] = {}
+        self._slots = threading.Semaphore(max_in_flight)
+        self._threads: list[threading.Thread] = []
+
+    def stage_stats(self, stage: str, workers: int = 1) -> StageStats:
+        stats = StageStats(workers=workers)
+        self.stats.setdefault(stage, []).append(stats)
+        return stats
+
+    def spawn(self, stage: str, target: Callable[..., None], *args: object) -> None:
+        stats = self.stage_stats(stage)
+
+        def run() -> None:
+            try:
+                target(self, stats, *args)
+            except BaseException as exc:
+                self.failures.append(exc)
+                self.stop.set()
+
+        thread = threading.Thread(target=run, name=f"{stage}-{len(self.stats[stage])}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+        if self.failures:
+            raise self.failures[0]
+
+    def acquire_slot(self, stats: StageStats) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                if self._slots.acquire(timeout=QUEUE_POLL_SECONDS):
+                    return True
+            return False
+        finally:
+            stats.blocked_seconds += time.perf_counter() - started
+
+    def release_slot(self) -> None:
+        self._slots.release()
+
+    def put(self, target: queue.Queue, item: object, stats: StageStats) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    target.put(item, timeout=QUEUE_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked_seconds += time.perf_counter() - started
+
+    def get(self, source: queue.Queue, stats: StageStats) -> object:
+        started = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    return source.get(timeout=QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return END_OF_STREAM
+        finally:
+            stats.idle_seconds += time.perf_counter() - started
+
+    def report(self) -> dict[str, dict[str, float]]:
+        report: dict[str, dict[str, float]] = {}
+        for stage, threads in self.stats.items():
+            report[stage] = {
+                "workers": sum(stats.workers for stats in threads),
+                "chunks": sum(stats.chunks for stats in threads),
+                "busySeconds": round(sum(stats.busy_seconds for stats in threads), 3),
+                "idleSeconds": round(sum(stats.idle_seconds for stats in threads), 3),
+                "blockedSeconds": round(sum(stats.blocked_seconds for stats in threads), 3),
+            }
+        return report
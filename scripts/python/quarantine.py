@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import polars as pl
+import pyarrow.parquet as pq
+
+PART_PATTERN = "part-*.parquet"
+
+
+class QuarantineWriter:
+    # Un part-NNNNN.parquet por bloque con rechazos, con el mismo índice del checkpoint: se
+    # escribe completo (temporal + rename) antes de confirmar el bloque, así un corte nunca
+    # deja un archivo ilegible y al reanudar el bloque repetido reemplaza su propio archivo.
+    def __init__(self, directory: Path, resume: bool = False) -> None:
+        self.directory = directory
+        for leftover in directory.glob("*.tmp"):
+            leftover.unlink()
+        if not resume:
+            for part in directory.glob(PART_PATTERN):
+                part.unlink()
+
+    def part_path(self, chunk_index: int) -> Path:
+        return self.directory / f"part-{chunk_index:05d}.parquet"
+
+    def write(self, chunk_index: int, rejected: pl.DataFrame | None) -> None:
+        path = self.part_path(chunk_index)
+        if rejected is None or rejected.height == 0:
+            path.unlink(missing_ok=True)
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.name}.tmp")
+        pq.write_table(rejected.to_arrow(), temporary, compression="zstd")
+        temporary.replace(path)
+
+    def close(self) -> Path | None:
+        return self.directory if any(self.directory.glob(PART_PATTERN)) else None
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los scripts son módulos planos: se importan igual que desde scripts/python.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
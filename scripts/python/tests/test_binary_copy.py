@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import polars as pl
+
+from binary_copy import localize
+
+
+def test_localize_gap_keeps_microseconds():
+    naive = pl.Series(
+        [datetime(2024, 3, 31, 2, 30), datetime(2024, 6, 1, 10, 15, 0, 489295)],
+        dtype=pl.Datetime("us"),
+    )
+
+    values = localize(naive, "Europe/Madrid")
+
+    assert values.dtype == pl.Datetime("us", "Europe/Madrid")
+    # La hora inexistente usa el desfase previo al salto (+01:00), como PostgreSQL.
+    assert values[0] == datetime.fromisoformat("2024-03-31T03:30:00+02:00")
+    assert values[1] == datetime.fromisoformat("2024-06-01T10:15:00.489295+02:00")
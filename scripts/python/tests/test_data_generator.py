@@ -0,0 +1,26 @@
+import polars as pl
+
+from data_generator import Injection, iter_batches, write_batches
+from etl_processor import DATE_COLUMNS, scan_input_file, transform_chunk
+
+
+def test_bad_date_pct_only_nulls_injected_share(tmp_path):
+    output_path = tmp_path / "bad_dates.csv"
+    write_batches(iter_batches(20_000, 5_000, seed=7, injection=Injection(bad_date_pct=10.0)), output_path, "csv")
+
+    texts = pl.read_csv(output_path, infer_schema_length=0).select(DATE_COLUMNS)
+    parsed = transform_chunk(scan_input_file(output_path).collect()).select(DATE_COLUMNS)
+
+    # Una fila conserva sus fechas si cada texto presente se parseó.
+    dates_ok = pl.all_horizontal(
+        texts.get_column(column).is_null() | parsed.get_column(column).is_not_null() for column in DATE_COLUMNS
+    )
+    share = pl.select(dates_ok.mean()).item()
+    assert abs(share - 0.9) < 0.01
+
+
+def test_same_seed_generates_same_dates():
+    first = pl.concat(iter_batches(1_000, 400, seed=3))
+    second = pl.concat(iter_batches(1_000, 400, seed=3))
+
+    assert first.equals(second)
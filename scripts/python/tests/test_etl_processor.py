@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from etl_processor import CSV_INFER_SCHEMA_LENGTH, SOURCE_COLUMNS, scan_input_file
+
+
+def write_source_csv(path: Path, rows: int, **overrides: list) -> Path:
+    frame = pl.DataFrame({column: ["1"] * rows for column in SOURCE_COLUMNS}).with_columns(
+        pl.Series(column, values) for column, values in overrides.items()
+    )
+    frame.write_csv(path)
+    return path
+
+
+def test_csv_value_that_does_not_fit_inferred_type_fails(tmp_path):
+    rows = CSV_INFER_SCHEMA_LENGTH + 100
+    accounts = [str(index) for index in range(rows)]
+    accounts[-1] = "ACCT-77"
+    input_path = write_source_csv(tmp_path / "input.csv", rows, NumeroCuentaInversion=accounts)
+
+    with pytest.raises(pl.exceptions.ComputeError):
+        scan_input_file(input_path).collect()
+
+
+def test_csv_keeps_inferred_canonical_values(tmp_path):
+    input_path = write_source_csv(
+        tmp_path / "input.csv",
+        3,
+        NumeroCuentaInversion=["00123", "7", "8"],
+        Asesor=["3.0", "4", "5"],
+    )
+
+    frame = scan_input_file(input_path).collect()
+
+    assert frame.get_column("NumeroCuentaInversion").cast(pl.String).to_list() == ["123", "7", "8"]
+    assert frame.get_column("Asesor").cast(pl.Int32).to_list() == [3, 4, 5]
@@ -0,0 +1,37 @@
+import polars as pl
+
+from quarantine import QuarantineWriter
+
+
+def rejected_rows(*source_rows: int) -> pl.DataFrame:
+    return pl.DataFrame({"source_row": list(source_rows), "reject_reason": ["required"] * len(source_rows)})
+
+
+def test_resume_keeps_committed_parts_and_drops_unfinished_files(tmp_path):
+    directory = tmp_path / "rechazos"
+    first = QuarantineWriter(directory)
+    first.write(0, rejected_rows(1, 2))
+    first.write(1, rejected_rows(7))
+    # Un corte a mitad de escritura solo deja el temporal, nunca un part ilegible.
+    (directory / "part-00002.parquet.tmp").write_bytes(b"PAR1")
+
+    resumed = QuarantineWriter(directory, resume=True)
+    resumed.write(1, rejected_rows(7))
+    resumed.write(2, rejected_rows(11))
+
+    assert resumed.close() == directory
+    assert sorted(path.name for path in directory.iterdir()) == [
+        "part-00000.parquet",
+        "part-00001.parquet",
+        "part-00002.parquet",
+    ]
+    assert pl.read_parquet(directory / "*.parquet").get_column("source_row").to_list() == [1, 2, 7, 11]
+
+
+def test_new_run_clears_previous_parts(tmp_path):
+    directory = tmp_path / "rechazos"
+    QuarantineWriter(directory).write(0, rejected_rows(1))
+
+    writer = QuarantineWriter(directory)
+
+    assert writer.close() is None
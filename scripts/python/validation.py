@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+import polars as pl
+
+REJECT_REASON_COLUMN = "__reject_reason"
+
+REQUIRED_RULE = "required"
+
+RULE_TYPES = ["not_null", "range", "enum", "order"]
+
+
+def rule_expr(rule: dict) -> pl.Expr:
+    # Cada regla da True cuando la fila la cumple; salvo not_null, un nulo no la incumple.
+    rule_type = rule["type"]
+
+    if rule_type == "not_null":
+        return pl.all_horizontal(pl.col(rule["columns"]).is_not_null())
+
+    if rule_type == "range":
+        column = pl.col(rule["column"])
+        passes = pl.lit(True)
+        if rule.get("min") is not None:
+            passes = passes & (column >= rule["min"])
+        if rule.get("max") is not None:
+            passes = passes & (column <= rule["max"])
+        return column.is_null() | passes
+
+    if rule_type == "enum":
+        column = pl.col(rule["column"])
+        return column.is_null() | column.is_in(rule["values"])
+
+    if rule_type == "order":
+        earlier, later = (pl.col(name) for name in rule["columns"])
+        return earlier.is_null() | later.is_null() | (earlier <= later)
+
+    raise ValueError(f"Tipo de regla no soportado: {rule_type}. Use {', '.join(RULE_TYPES)}")
+
+
+def reject_reason_expr(rules: list[dict]) -> pl.Expr:
+    # Todas las reglas en una sola expresión: la fila lleva el código de la primera que
+    # incumple, o nulo si es válida.
+    return pl.coalesce(
+        [pl.when(~rule_expr(rule)).then(pl.lit(rule["code"])) for rule in rules] + [pl.lit(None, pl.String)]
+    ).alias(REJECT_REASON_COLUMN)
+
+
+def split_rejected(frame: pl.DataFrame, rules: list[dict]) -> tuple[pl.DataFrame, pl.DataFrame]:
+    flagged = frame.with_columns(reject_reason_expr(rules))
+    is_valid = pl.col(REJECT_REASON_COLUMN).is_null()
+    return flagged.filter(is_valid).drop(REJECT_REASON_COLUMN), flagged.filter(~is_valid)
+
+
+def reject_counts(rejected: pl.DataFrame) -> dict[str, int]:
+    if rejected.height == 0:
+        return {}
+    return dict(rejected.get_column(REJECT_REASON_COLUMN).value_counts().iter_rows())
+
+
+def load_rules(rules_path: Path, default_rules: list[dict], columns: list[str]) -> list[dict]:
+    rules = json.loads(rules_path.read_text(encoding="utf-8"))
+    codes = {rule["code"] for rule in default_rules}
+
+    for rule in rules:
+        code = rule.get("code")
+        if not code or code in codes:
+            raise ValueError(f"Cada regla de {rules_path} necesita un code único: {rule}")
+        codes.add(code)
+
+        referenced = rule.get("columns") or [rule.get("column")]
+        unknown = [name for name in referenced if name not in columns]
+        if unknown:
+            raise ValueError(f"La regla {code} usa columnas desconocidas: {', '.join(map(str, unknown))}")
+        rule_expr(rule)
+
+    # La regla de columnas críticas va primero: es la que el filtro de la lectura ya aplicó.
+    return [*default_rules, *rules]
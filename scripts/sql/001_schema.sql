@@ -11,6 +11,8 @@ CREATE TABLE IF NOT EXISTS process_control (
     rows_read BIGINT NOT NULL DEFAULT 0,
     rows_loaded BIGINT NOT NULL DEFAULT 0,
     rows_rejected BIGINT NOT NULL DEFAULT 0,
+    payload_hash_algorithm VARCHAR(20) NULL,
+    quarantine_path TEXT NULL,
     message TEXT NULL,
     error_details TEXT NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
@@ -49,6 +51,7 @@ CREATE TABLE IF NOT EXISTS staging_transactions (
     dias_permanencia BIGINT NOT NULL,
     fecha_vto_teorica TIMESTAMPTZ NULL,
     fecha_ultima_cancelacion TIMESTAMPTZ NULL,
+    source_row BIGINT NULL,
     ingested_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
@@ -58,6 +61,20 @@ CREATE INDEX IF NOT EXISTS ix_staging_process
 CREATE INDEX IF NOT EXISTS ix_staging_tx
     ON staging_transactions (transaction_id, source_system);
 
+CREATE TABLE IF NOT EXISTS etl_checkpoints (
+    process_id UUID NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    row_offset BIGINT NOT NULL,
+    rows_read BIGINT NOT NULL,
+    rows_loaded BIGINT NOT NULL,
+    rows_unchanged BIGINT NOT NULL DEFAULT 0,
+    rows_rejected_by_rule JSONB NOT NULL DEFAULT '{}'::JSONB,
+    quarantine BOOLEAN NOT NULL DEFAULT FALSE,
+    committed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (process_id, chunk_index)
+);
+
 CREATE TABLE IF NOT EXISTS transactions (
     transaction_sk BIGSERIAL PRIMARY KEY,
     transaction_id CHAR(64) NOT NULL,
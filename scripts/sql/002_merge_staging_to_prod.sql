@@ -1,4 +1,30 @@
-CREATE OR REPLACE FUNCTION merge_staging_to_transactions(p_process_id UUID)
+-- Primer byte del digest de transaction_id (CHAR(64) hex o BYTEA, ver 007_hash_bytea.sql).
+CREATE OR REPLACE FUNCTION hash_leading_byte(p_hash BPCHAR)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT ('x' || SUBSTR(p_hash, 1, 2))::BIT(8)::INTEGER
+$$;
+
+CREATE OR REPLACE FUNCTION hash_leading_byte(p_hash BYTEA)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT GET_BYTE(p_hash, 0)
+$$;
+
+-- Merge de una partición: las filas cuyo primer byte de transaction_id cae en el rango
+-- [256 * p_partition / p_partition_count, 256 * (p_partition + 1) / p_partition_count).
+-- Una llave siempre cae en la misma partición, por lo que el dedup por llave sigue siendo
+-- correcto y las particiones se pueden ejecutar en paralelo en conexiones distintas.
+-- Los checkpoints se conservan hasta que todas las particiones terminan.
+CREATE OR REPLACE FUNCTION merge_staging_to_transactions_partition(
+    p_process_id UUID,
+    p_partition INTEGER,
+    p_partition_count INTEGER
+)
 RETURNS TABLE(inserted_count BIGINT, updated_count BIGINT)
 LANGUAGE plpgsql
 AS $$
@@ -6,15 +32,23 @@ DECLARE
     v_inserted BIGINT := 0;
     v_updated BIGINT := 0;
 BEGIN
+    IF p_partition_count NOT BETWEEN 1 AND 256 OR p_partition NOT BETWEEN 0 AND p_partition_count - 1 THEN
+        RAISE EXCEPTION 'Partición inválida: % de %', p_partition, p_partition_count;
+    END IF;
+
     WITH ranked_source AS (
         SELECT
             s.*,
             ROW_NUMBER() OVER (
                 PARTITION BY s.transaction_id, s.source_system
-                ORDER BY s.ingested_at DESC, s.staging_id DESC
+                ORDER BY s.source_row DESC NULLS LAST, s.ingested_at DESC, s.staging_id DESC
             ) AS rn
         FROM staging_transactions s
         WHERE s.process_id = p_process_id
+          AND (
+              p_partition_count = 1
+              OR hash_leading_byte(s.transaction_id) * p_partition_count / 256 = p_partition
+          )
     ),
     source_dedup AS (
         SELECT *
@@ -103,7 +137,9 @@ BEGIN
             fecha_ultima_cancelacion = EXCLUDED.fecha_ultima_cancelacion,
             updated_at = NOW()
         WHERE transactions.payload_hash <> EXCLUDED.payload_hash
-        RETURNING (xmax = 0) AS inserted
+        -- xmax no se puede leer en RETURNING de una tabla particionada (009); una fila recién
+        -- insertada tiene inserted_at = NOW() de esta transacción y una actualizada no.
+        RETURNING (inserted_at = NOW()) AS inserted
     )
     SELECT
         COUNT(*) FILTER (WHERE inserted),
@@ -111,9 +147,27 @@ BEGIN
     INTO v_inserted, v_updated
     FROM upserted;
 
-    DELETE FROM staging_transactions
-    WHERE process_id = p_process_id;
+    DELETE FROM staging_transactions s
+    WHERE s.process_id = p_process_id
+      AND (
+          p_partition_count = 1
+          OR hash_leading_byte(s.transaction_id) * p_partition_count / 256 = p_partition
+      );
 
     RETURN QUERY SELECT v_inserted, v_updated;
 END;
 $$;
+
+CREATE OR REPLACE FUNCTION merge_staging_to_transactions(p_process_id UUID)
+RETURNS TABLE(inserted_count BIGINT, updated_count BIGINT)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT m.inserted_count, m.updated_count
+    FROM merge_staging_to_transactions_partition(p_process_id, 0, 1) m;
+
+    DELETE FROM etl_checkpoints
+    WHERE process_id = p_process_id;
+END;
+$$;
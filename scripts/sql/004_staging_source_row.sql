@@ -0,0 +1,2 @@
+ALTER TABLE staging_transactions
+    ADD COLUMN IF NOT EXISTS source_row BIGINT NULL;
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS etl_checkpoints (
+    process_id UUID NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    row_offset BIGINT NOT NULL,
+    rows_read BIGINT NOT NULL,
+    rows_loaded BIGINT NOT NULL,
+    committed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (process_id, chunk_index)
+);
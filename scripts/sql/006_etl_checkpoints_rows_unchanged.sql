@@ -0,0 +1,2 @@
+ALTER TABLE etl_checkpoints
+    ADD COLUMN IF NOT EXISTS rows_unchanged BIGINT NOT NULL DEFAULT 0;
@@ -0,0 +1,35 @@
+-- Opcional: guarda transaction_id y payload_hash como digest SHA-256 crudo (BYTEA de 32 bytes)
+-- en lugar de CHAR(64) hexadecimal. El ETL debe ejecutarse con --hash-encoding raw
+-- (Pipeline:HashEncoding = "raw"). Reescribe ambas tablas: aplicar sin cargas en curso.
+-- Reversión: ALTER COLUMN ... TYPE CHAR(64) USING encode(columna, 'hex').
+DO $$
+BEGIN
+    IF format_type(
+        (SELECT atttypid FROM pg_attribute WHERE attrelid = 'transactions'::regclass AND attname = 'transaction_id'),
+        NULL
+    ) = 'bytea' THEN
+        RETURN;
+    END IF;
+
+    DROP INDEX IF EXISTS ix_staging_tx;
+
+    ALTER TABLE staging_transactions
+        ALTER COLUMN transaction_id TYPE BYTEA USING decode(transaction_id, 'hex'),
+        ALTER COLUMN payload_hash TYPE BYTEA USING decode(payload_hash, 'hex');
+
+    ALTER TABLE transactions
+        DROP CONSTRAINT ux_transactions_transaction;
+
+    ALTER TABLE transactions
+        ALTER COLUMN transaction_id TYPE BYTEA USING decode(transaction_id, 'hex'),
+        ALTER COLUMN payload_hash TYPE BYTEA USING decode(payload_hash, 'hex'),
+        ADD CONSTRAINT ck_transactions_hash_length
+            CHECK (octet_length(transaction_id) = 32 AND octet_length(payload_hash) = 32);
+
+    ALTER TABLE transactions
+        ADD CONSTRAINT ux_transactions_transaction UNIQUE (transaction_id, source_system);
+
+    CREATE INDEX ix_staging_tx
+        ON staging_transactions (transaction_id, source_system);
+END;
+$$;
@@ -0,0 +1,7 @@
+ALTER TABLE process_control
+    ADD COLUMN IF NOT EXISTS payload_hash_algorithm VARCHAR(20) NULL;
+
+UPDATE process_control
+SET payload_hash_algorithm = 'sha256'
+WHERE status = 'Completed'
+  AND payload_hash_algorithm IS NULL;
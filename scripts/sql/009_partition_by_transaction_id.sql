@@ -0,0 +1,78 @@
+-- Opcional: particiona transactions y staging_transactions en 16 rangos por el primer dígito
+-- hexadecimal de transaction_id (transactions_p0..p15, staging_transactions_p0..p15). Como
+-- transaction_id ya es un SHA-256, los rangos reparten igual que un particionado por hash, y el
+-- ETL puede calcular la partición de cada fila y hacer COPY directo a staging_transactions_pN.
+-- Sirve con CHAR(64) y con BYTEA; si se usa 007_hash_bytea.sql, aplicarlo antes que este script
+-- (no se puede cambiar el tipo de la llave de partición). Copia ambas tablas: aplicar sin cargas.
+DO $$
+DECLARE
+    v_bytea BOOLEAN;
+    v_table TEXT;
+    v_lower TEXT;
+    v_upper TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'transactions'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    v_bytea := format_type(
+        (SELECT atttypid FROM pg_attribute WHERE attrelid = 'transactions'::regclass AND attname = 'transaction_id'),
+        NULL
+    ) = 'bytea';
+
+    CREATE TABLE transactions_partitioned (LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (transaction_id);
+    CREATE TABLE staging_transactions_partitioned (LIKE staging_transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (transaction_id);
+
+    FOR i IN 0..15 LOOP
+        IF v_bytea THEN
+            v_lower := format('(%L::BYTEA)', '\x' || to_hex(i) || '0');
+            v_upper := format('(%L::BYTEA)', '\x' || to_hex(i + 1) || '0');
+        ELSE
+            v_lower := format('(%L)', to_hex(i));
+            v_upper := format('(%L)', to_hex(i + 1));
+        END IF;
+
+        FOREACH v_table IN ARRAY ARRAY['transactions', 'staging_transactions'] LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM %s TO %s',
+                v_table || '_p' || i,
+                v_table || '_partitioned',
+                CASE WHEN i = 0 THEN '(MINVALUE)' ELSE v_lower END,
+                CASE WHEN i = 15 THEN '(MAXVALUE)' ELSE v_upper END
+            );
+        END LOOP;
+    END LOOP;
+
+    INSERT INTO transactions_partitioned SELECT * FROM transactions;
+    INSERT INTO staging_transactions_partitioned SELECT * FROM staging_transactions;
+
+    ALTER SEQUENCE transactions_transaction_sk_seq OWNED BY transactions_partitioned.transaction_sk;
+    ALTER SEQUENCE staging_transactions_staging_id_seq OWNED BY staging_transactions_partitioned.staging_id;
+
+    DROP TABLE transactions;
+    DROP TABLE staging_transactions;
+    ALTER TABLE transactions_partitioned RENAME TO transactions;
+    ALTER TABLE staging_transactions_partitioned RENAME TO staging_transactions;
+
+    -- Las llaves primarias y únicas de una tabla particionada deben incluir transaction_id.
+    ALTER TABLE transactions
+        ADD CONSTRAINT transactions_pkey PRIMARY KEY (transaction_sk, transaction_id),
+        ADD CONSTRAINT ux_transactions_transaction UNIQUE (transaction_id, source_system);
+    CREATE INDEX ix_transactions_fondo_identificacion
+        ON transactions (cod_fondo, identificacion);
+
+    ALTER TABLE staging_transactions
+        ADD CONSTRAINT staging_transactions_pkey PRIMARY KEY (staging_id, transaction_id);
+    CREATE INDEX ix_staging_process
+        ON staging_transactions (process_id);
+    CREATE INDEX ix_staging_tx
+        ON staging_transactions (transaction_id, source_system);
+
+    CREATE TRIGGER trg_transactions_updated_at
+    BEFORE UPDATE ON transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION set_updated_at();
+END;
+$$;
@@ -0,0 +1,2 @@
+ALTER TABLE etl_checkpoints
+    ADD COLUMN IF NOT EXISTS rows_rejected_by_rule JSONB NOT NULL DEFAULT '{}'::JSONB;
@@ -0,0 +1,2 @@
+ALTER TABLE process_control
+    ADD COLUMN IF NOT EXISTS quarantine_path TEXT NULL;
@@ -0,0 +1,2 @@
+ALTER TABLE etl_checkpoints
+    ADD COLUMN IF NOT EXISTS quarantine BOOLEAN NOT NULL DEFAULT FALSE;
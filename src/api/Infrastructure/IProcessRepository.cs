@@ -8,7 +8,8 @@ public interface IProcessRepository
     Task<ProcessControlRecord?> GetByIdAsync(Guid processId, CancellationToken cancellationToken);
     Task<bool> TryMarkRunningAsync(Guid processId, CancellationToken cancellationToken);
     Task UpdateRunningMessageAsync(Guid processId, string message, CancellationToken cancellationToken);
-    Task MarkCompletedAsync(Guid processId, long rowsRead, long rowsLoaded, long rowsRejected, string message, CancellationToken cancellationToken);
+    Task MarkCompletedAsync(Guid processId, long rowsRead, long rowsLoaded, long rowsRejected, string payloadHashAlgorithm, string? quarantinePath, string message, CancellationToken cancellationToken);
     Task MarkFailedAsync(Guid processId, string message, string errorDetails, CancellationToken cancellationToken);
     Task<(long InsertedCount, long UpdatedCount)> MergeToProductionAsync(Guid processId, CancellationToken cancellationToken);
+    Task<(long InsertedCount, long UpdatedCount)> MergeToProductionPartitionedAsync(Guid processId, int partitionCount, CancellationToken cancellationToken);
 }
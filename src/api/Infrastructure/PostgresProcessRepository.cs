@@ -47,7 +47,7 @@ public sealed class PostgresProcessRepository : IProcessRepository
                     WHEN process_control.status = 'Failed' THEN NULL
                     ELSE process_control.error_details
                 END
-            RETURNING process_id, source_hash, source_path, source_system, status, started_at, finished_at, rows_read, rows_loaded, rows_rejected, message, error_details;
+            RETURNING process_id, source_hash, source_path, source_system, status, started_at, finished_at, rows_read, rows_loaded, rows_rejected, payload_hash_algorithm, quarantine_path, message, error_details;
             """;
 
         await using var conn = await _dataSource.OpenConnectionAsync(cancellationToken);
@@ -69,7 +69,7 @@ public sealed class PostgresProcessRepository : IProcessRepository
     public async Task<ProcessControlRecord?> GetByIdAsync(Guid processId, CancellationToken cancellationToken)
     {
         const string sql = """
-            SELECT process_id, source_hash, source_path, source_system, status, started_at, finished_at, rows_read, rows_loaded, rows_rejected, message, error_details
+            SELECT process_id, source_hash, source_path, source_system, status, started_at, finished_at, rows_read, rows_loaded, rows_rejected, payload_hash_algorithm, quarantine_path, message, error_details
             FROM process_control
             WHERE process_id = @process_id;
             """;
@@ -128,6 +128,8 @@ public sealed class PostgresProcessRepository : IProcessRepository
         long rowsRead,
         long rowsLoaded,
         long rowsRejected,
+        string payloadHashAlgorithm,
+        string? quarantinePath,
         string message,
         CancellationToken cancellationToken)
     {
@@ -138,6 +140,8 @@ public sealed class PostgresProcessRepository : IProcessRepository
                 rows_read = @rows_read,
                 rows_loaded = @rows_loaded,
                 rows_rejected = @rows_rejected,
+                payload_hash_algorithm = @payload_hash_algorithm,
+                quarantine_path = @quarantine_path,
                 message = @message,
                 error_details = NULL
             WHERE process_id = @process_id;
@@ -149,6 +153,8 @@ public sealed class PostgresProcessRepository : IProcessRepository
         cmd.Parameters.AddWithValue("rows_read", rowsRead);
         cmd.Parameters.AddWithValue("rows_loaded", rowsLoaded);
         cmd.Parameters.AddWithValue("rows_rejected", rowsRejected);
+        cmd.Parameters.AddWithValue("payload_hash_algorithm", payloadHashAlgorithm);
+        cmd.Parameters.AddWithValue("quarantine_path", (object?)quarantinePath ?? DBNull.Value);
         cmd.Parameters.AddWithValue("message", message);
 
         await cmd.ExecuteNonQueryAsync(cancellationToken);
@@ -192,6 +198,53 @@ public sealed class PostgresProcessRepository : IProcessRepository
         return (reader.GetInt64(0), reader.GetInt64(1));
     }
 
+    public async Task<(long InsertedCount, long UpdatedCount)> MergeToProductionPartitionedAsync(
+        Guid processId,
+        int partitionCount,
+        CancellationToken cancellationToken)
+    {
+        // Cada partición corre en su propia conexión y transacción; si alguna falla, las ya
+        // confirmadas no dejan filas en staging y un reintento solo mezcla las pendientes.
+        var results = await Task.WhenAll(Enumerable.Range(0, partitionCount)
+            .Select(partition => MergePartitionAsync(processId, partition, partitionCount, cancellationToken)));
+
+        const string sql = "DELETE FROM etl_checkpoints WHERE process_id = @process_id;";
+
+        await using var conn = await _dataSource.OpenConnectionAsync(cancellationToken);
+        await using var cmd = new NpgsqlCommand(sql, conn);
+        cmd.Parameters.AddWithValue("process_id", processId);
+        await cmd.ExecuteNonQueryAsync(cancellationToken);
+
+        return (results.Sum(result => result.InsertedCount), results.Sum(result => result.UpdatedCount));
+    }
+
+    private async Task<(long InsertedCount, long UpdatedCount)> MergePartitionAsync(
+        Guid processId,
+        int partition,
+        int partitionCount,
+        CancellationToken cancellationToken)
+    {
+        const string sql = """
+            SELECT inserted_count, updated_count
+            FROM merge_staging_to_transactions_partition(@process_id, @partition, @partition_count);
+            """;
+
+        await using var conn = await _dataSource.OpenConnectionAsync(cancellationToken);
+        await using var cmd = new NpgsqlCommand(sql, conn);
+        cmd.Parameters.AddWithValue("process_id", processId);
+        cmd.Parameters.AddWithValue("partition", partition);
+        cmd.Parameters.AddWithValue("partition_count", partitionCount);
+        cmd.CommandTimeout = MergeCommandTimeoutSeconds;
+
+        await using var reader = await cmd.ExecuteReaderAsync(cancellationToken);
+        if (!await reader.ReadAsync(cancellationToken))
+        {
+            return (0, 0);
+        }
+
+        return (reader.GetInt64(0), reader.GetInt64(1));
+    }
+
     private static ProcessControlRecord MapRecord(NpgsqlDataReader reader)
     {
         return new ProcessControlRecord
@@ -206,8 +259,10 @@ public sealed class PostgresProcessRepository : IProcessRepository
             RowsRead = reader.GetInt64(7),
             RowsLoaded = reader.GetInt64(8),
             RowsRejected = reader.GetInt64(9),
-            Message = reader.IsDBNull(10) ? null : reader.GetString(10),
-            ErrorDetails = reader.IsDBNull(11) ? null : reader.GetString(11)
+            PayloadHashAlgorithm = reader.IsDBNull(10) ? null : reader.GetString(10),
+            QuarantinePath = reader.IsDBNull(11) ? null : reader.GetString(11),
+            Message = reader.IsDBNull(12) ? null : reader.GetString(12),
+            ErrorDetails = reader.IsDBNull(13) ? null : reader.GetString(13)
         };
     }
 }
@@ -15,6 +15,8 @@ public sealed record ProcessStatusResponse(
     long RowsRead,
     long RowsLoaded,
     long RowsRejected,
+    string? PayloadHashAlgorithm,
+    string? QuarantinePath,
     string? Message,
     string? ErrorDetails);
 
@@ -30,8 +32,18 @@ public sealed class ProcessControlRecord
     public long RowsRead { get; init; }
     public long RowsLoaded { get; init; }
     public long RowsRejected { get; init; }
+    public string? PayloadHashAlgorithm { get; init; }
+    public string? QuarantinePath { get; init; }
     public string? Message { get; init; }
     public string? ErrorDetails { get; init; }
 }
 
-public sealed record EtlMetrics(Guid ProcessId, string SourceHash, long RowsRead, long RowsLoaded, long RowsRejected);
+public sealed record EtlMetrics(
+    Guid ProcessId,
+    string SourceHash,
+    long RowsRead,
+    long RowsLoaded,
+    long RowsRejected,
+    long RowsUnchanged = 0,
+    string PayloadHashAlgorithm = "sha256",
+    string? QuarantinePath = null);
@@ -7,4 +7,20 @@ public sealed class PipelineOptions
     public string DefaultParquetPath { get; set; } = "fondos_500mb.parquet";
     public string SourceSystem { get; set; } = "ExternalProvider";
     public int ChunkSize { get; set; } = 200000;
+    public string CopyFormat { get; set; } = "csv";
+    public string HashEncoding { get; set; } = "hex";
+    public string PayloadHashAlgorithm { get; set; } = "sha256";
+    public bool AllowPayloadHashChange { get; set; } = false;
+    public int EtlWorkers { get; set; } = 1;
+    public int TransformProcesses { get; set; } = 0;
+    public bool ResumeEtl { get; set; } = true;
+    public int MergePartitions { get; set; } = 1;
+    public bool DeltaLoad { get; set; } = false;
+    public string DeltaSource { get; set; } = "snapshot";
+    public string CsvSchemaPath { get; set; } = "";
+    public bool DateMemo { get; set; } = false;
+    public bool AllowTzAwareDates { get; set; } = false;
+    public string ValidationRulesPath { get; set; } = "";
+    public string QuarantineDir { get; set; } = "";
+    public string HashCachePath { get; set; } = ".cache/file_hashes.json";
 }
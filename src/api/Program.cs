@@ -1,4 +1,3 @@
-using System.Security.Cryptography;
 using TransactionCloseExchange.Api.Infrastructure;
 using TransactionCloseExchange.Api.Models;
 using TransactionCloseExchange.Api.Options;
@@ -19,6 +18,7 @@ Environment.SetEnvironmentVariable("POSTGRES_CONNECTION", postgresConnection);
 builder.Services.AddSingleton(_ => NpgsqlDataSource.Create(postgresConnection));
 builder.Services.AddSingleton<IProcessRepository, PostgresProcessRepository>();
 builder.Services.AddSingleton<IProcessQueue, InMemoryProcessQueue>();
+builder.Services.AddSingleton<IFileHashCache, JsonFileHashCache>();
 builder.Services.AddHostedService<PortfolioProcessWorker>();
 
 var app = builder.Build();
@@ -32,6 +32,7 @@ app.MapPost("/api/portfolio/process", async (
     ProcessRequest request,
     IProcessRepository repository,
     IProcessQueue queue,
+    IFileHashCache hashCache,
     IConfiguration configuration,
     CancellationToken cancellationToken) =>
 {
@@ -51,7 +52,7 @@ app.MapPost("/api/portfolio/process", async (
         return Results.BadRequest(new { error = $"Archivo no encontrado: {normalizedPath}" });
     }
 
-    var sourceHash = ComputeFileHash(normalizedPath);
+    var sourceHash = await hashCache.GetOrComputeAsync(normalizedPath, cancellationToken);
     var sourceSystem = string.IsNullOrWhiteSpace(request.SourceSystem)
         ? configuration.GetSection("Pipeline").GetValue<string>("SourceSystem") ?? "ExternalProvider"
         : request.SourceSystem;
@@ -100,6 +101,8 @@ app.MapGet("/api/portfolio/status/{id:guid}", async (
         process.RowsRead,
         process.RowsLoaded,
         process.RowsRejected,
+        process.PayloadHashAlgorithm,
+        process.QuarantinePath,
         process.Message,
         process.ErrorDetails);
 
@@ -112,11 +115,3 @@ app.MapGet("/api/portfolio/status/{id:guid}", async (
 .Produces(StatusCodes.Status404NotFound);
 
 app.Run();
-
-static string ComputeFileHash(string path)
-{
-    using var sha = SHA256.Create();
-    using var stream = File.OpenRead(path);
-    var hash = sha.ComputeHash(stream);
-    return Convert.ToHexString(hash).ToLowerInvariant();
-}
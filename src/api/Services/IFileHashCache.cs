@@ -0,0 +1,6 @@
+namespace TransactionCloseExchange.Api.Services;
+
+public interface IFileHashCache
+{
+    Task<string> GetOrComputeAsync(string path, CancellationToken cancellationToken = default);
+}
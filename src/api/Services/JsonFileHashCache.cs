@@ -0,0 +1,121 @@
+using System.Security.Cryptography;
+using System.Text.Json;
+using Microsoft.Extensions.Options;
+using TransactionCloseExchange.Api.Options;
+
+namespace TransactionCloseExchange.Api.Services;
+
+public sealed class JsonFileHashCache : IFileHashCache
+{
+    private const int HashBufferSize = 16 * 1024 * 1024;
+    private const long NanosecondsPerTick = 100;
+
+    private readonly string _cachePath;
+    private readonly SemaphoreSlim _cacheLock = new(1, 1);
+    private readonly JsonSerializerOptions _jsonOptions = new(JsonSerializerDefaults.Web) { WriteIndented = true };
+
+    public JsonFileHashCache(IOptions<PipelineOptions> options, IWebHostEnvironment env)
+    {
+        var workspaceRoot = Path.GetFullPath(Path.Combine(env.ContentRootPath, "..", ".."));
+        var cachePath = options.Value.HashCachePath;
+        _cachePath = Path.IsPathRooted(cachePath) ? cachePath : Path.GetFullPath(Path.Combine(workspaceRoot, cachePath));
+    }
+
+    public async Task<string> GetOrComputeAsync(string path, CancellationToken cancellationToken = default)
+    {
+        var key = Path.GetFullPath(path);
+        var before = new FileInfo(key);
+        var size = before.Length;
+        var mtimeTicks = (before.LastWriteTimeUtc - DateTime.UnixEpoch).Ticks;
+
+        await _cacheLock.WaitAsync(cancellationToken);
+        try
+        {
+            var entries = await LoadAsync(cancellationToken);
+            // El ETL Python guarda mtime en ns y el inode real; .NET compara a resolución de 100 ns y no conoce el inode.
+            if (entries.TryGetValue(key, out var cached)
+                && cached.Size == size
+                && cached.MtimeNs / NanosecondsPerTick == mtimeTicks
+                && !string.IsNullOrEmpty(cached.Sha256))
+            {
+                return cached.Sha256;
+            }
+        }
+        finally
+        {
+            _cacheLock.Release();
+        }
+
+        var hash = await ComputeFileHashAsync(key, cancellationToken);
+
+        var after = new FileInfo(key);
+        if (after.Length != size || after.LastWriteTimeUtc != before.LastWriteTimeUtc)
+        {
+            return hash;
+        }
+
+        await _cacheLock.WaitAsync(cancellationToken);
+        try
+        {
+            var entries = await LoadAsync(cancellationToken);
+            entries[key] = new FileHashCacheEntry(size, mtimeTicks * NanosecondsPerTick, 0, hash);
+            await SaveAsync(entries, cancellationToken);
+        }
+        finally
+        {
+            _cacheLock.Release();
+        }
+
+        return hash;
+    }
+
+    private static async Task<string> ComputeFileHashAsync(string path, CancellationToken cancellationToken)
+    {
+        await using var stream = new FileStream(
+            path,
+            FileMode.Open,
+            FileAccess.Read,
+            FileShare.Read,
+            HashBufferSize,
+            FileOptions.Asynchronous | FileOptions.SequentialScan);
+
+        var hash = await SHA256.HashDataAsync(stream, cancellationToken);
+        return Convert.ToHexString(hash).ToLowerInvariant();
+    }
+
+    private async Task<Dictionary<string, FileHashCacheEntry>> LoadAsync(CancellationToken cancellationToken)
+    {
+        if (!File.Exists(_cachePath))
+        {
+            return new Dictionary<string, FileHashCacheEntry>();
+        }
+
+        try
+        {
+            await using var stream = File.OpenRead(_cachePath);
+            var document = await JsonSerializer.DeserializeAsync<FileHashCacheDocument>(stream, _jsonOptions, cancellationToken);
+            return document?.Entries ?? new Dictionary<string, FileHashCacheEntry>();
+        }
+        catch (Exception ex) when (ex is JsonException or IOException)
+        {
+            return new Dictionary<string, FileHashCacheEntry>();
+        }
+    }
+
+    private async Task SaveAsync(Dictionary<string, FileHashCacheEntry> entries, CancellationToken cancellationToken)
+    {
+        Directory.CreateDirectory(Path.GetDirectoryName(_cachePath)!);
+        var tempPath = $"{_cachePath}.{Environment.ProcessId}.tmp";
+
+        await using (var stream = File.Create(tempPath))
+        {
+            await JsonSerializer.SerializeAsync(stream, new FileHashCacheDocument(1, entries), _jsonOptions, cancellationToken);
+        }
+
+        File.Move(tempPath, _cachePath, overwrite: true);
+    }
+
+    private sealed record FileHashCacheDocument(int Version, Dictionary<string, FileHashCacheEntry> Entries);
+
+    private sealed record FileHashCacheEntry(long Size, long MtimeNs, ulong Inode, string Sha256);
+}
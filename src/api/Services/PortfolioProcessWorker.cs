@@ -1,5 +1,4 @@
 using System.Diagnostics;
-using System.Security.Cryptography;
 using System.Text;
 using System.Text.Json;
 using Microsoft.Extensions.Options;
@@ -14,6 +13,7 @@ public sealed class PortfolioProcessWorker : BackgroundService
 {
 	private readonly IProcessQueue _queue;
 	private readonly IProcessRepository _repository;
+	private readonly IFileHashCache _hashCache;
 	private readonly PipelineOptions _options;
 	private readonly ILogger<PortfolioProcessWorker> _logger;
 	private readonly string _workspaceRoot;
@@ -22,12 +22,14 @@ public sealed class PortfolioProcessWorker : BackgroundService
 	public PortfolioProcessWorker(
 		IProcessQueue queue,
 		IProcessRepository repository,
+		IFileHashCache hashCache,
 		IOptions<PipelineOptions> options,
 		IWebHostEnvironment env,
 		ILogger<PortfolioProcessWorker> logger)
 	{
 		_queue = queue;
 		_repository = repository;
+		_hashCache = hashCache;
 		_options = options.Value;
 		_logger = logger;
 		_workspaceRoot = Path.GetFullPath(Path.Combine(env.ContentRootPath, "..", ".."));
@@ -61,19 +63,23 @@ public sealed class PortfolioProcessWorker : BackgroundService
 		try
 		{
 			var sourcePath = ResolvePath(process.SourcePath);
-			var sourceHash = ComputeFileHash(sourcePath);
+			var sourceHash = await _hashCache.GetOrComputeAsync(sourcePath, cancellationToken);
 			await _repository.UpdateRunningMessageAsync(processId, "ETL en curso: preparando lectura y carga a staging", cancellationToken);
 
 			var metrics = await ExecuteEtlAsync(processId, sourcePath, sourceHash, process.SourceSystem, cancellationToken);
 			await _repository.UpdateRunningMessageAsync(processId, "ETL finalizado: iniciando merge staging -> producción", cancellationToken);
-			var mergeResult = await _repository.MergeToProductionAsync(processId, cancellationToken);
+			var mergeResult = _options.MergePartitions > 1
+				? await _repository.MergeToProductionPartitionedAsync(processId, _options.MergePartitions, cancellationToken)
+				: await _repository.MergeToProductionAsync(processId, cancellationToken);
 
-			var message = $"Merge completado. Insertados: {mergeResult.InsertedCount}, Actualizados: {mergeResult.UpdatedCount}";
+			var message = $"Merge completado. Insertados: {mergeResult.InsertedCount}, Actualizados: {mergeResult.UpdatedCount}, Sin cambios: {metrics.RowsUnchanged}";
 			await _repository.MarkCompletedAsync(
 				processId,
 				metrics.RowsRead,
 				mergeResult.InsertedCount + mergeResult.UpdatedCount,
 				metrics.RowsRejected,
+				metrics.PayloadHashAlgorithm,
+				metrics.QuarantinePath,
 				message,
 				cancellationToken);
 
@@ -94,7 +100,7 @@ public sealed class PortfolioProcessWorker : BackgroundService
 			?? throw new InvalidOperationException("Variable de entorno POSTGRES_CONNECTION no definida.");
 		var pythonConnInfo = BuildPythonConnInfo(postgresConnection);
 
-		var args = new[]
+		var args = new List<string>
 		{
 			Quote(etlScriptPath),
 			"--parquet-path", Quote(sourcePath),
@@ -102,9 +108,59 @@ public sealed class PortfolioProcessWorker : BackgroundService
 			"--source-hash", sourceHash,
 			"--source-system", sourceSystem,
 			"--chunk-size", _options.ChunkSize.ToString(),
+			"--copy-format", _options.CopyFormat,
+			"--hash-encoding", _options.HashEncoding,
+			"--payload-hash-algorithm", _options.PayloadHashAlgorithm,
+			"--workers", _options.EtlWorkers.ToString(),
+			"--transform-processes", _options.TransformProcesses.ToString(),
 			"--connection-string", Quote(pythonConnInfo)
 		};
 
+		if (_options.ResumeEtl)
+		{
+			args.Add("--resume");
+		}
+
+		if (_options.AllowPayloadHashChange)
+		{
+			args.Add("--allow-payload-hash-change");
+		}
+
+		if (_options.DeltaLoad)
+		{
+			args.Add("--delta");
+			args.Add("--delta-source");
+			args.Add(_options.DeltaSource);
+		}
+
+		if (_options.DateMemo)
+		{
+			args.Add("--date-memo");
+		}
+
+		if (_options.AllowTzAwareDates)
+		{
+			args.Add("--allow-tz-aware-dates");
+		}
+
+		if (!string.IsNullOrWhiteSpace(_options.CsvSchemaPath))
+		{
+			args.Add("--csv-schema");
+			args.Add(Quote(_options.CsvSchemaPath));
+		}
+
+		if (!string.IsNullOrWhiteSpace(_options.ValidationRulesPath))
+		{
+			args.Add("--validation-rules");
+			args.Add(Quote(_options.ValidationRulesPath));
+		}
+
+		if (!string.IsNullOrWhiteSpace(_options.QuarantineDir))
+		{
+			args.Add("--quarantine-path");
+			args.Add(Quote(Path.Combine(ResolvePath(_options.QuarantineDir), processId.ToString())));
+		}
+
 		var startInfo = new ProcessStartInfo
 		{
 			FileName = _options.PythonExecutable,
@@ -187,14 +243,6 @@ public sealed class PortfolioProcessWorker : BackgroundService
 		return Path.GetFullPath(Path.Combine(_workspaceRoot, path));
 	}
 
-	private static string ComputeFileHash(string path)
-	{
-		using var sha = SHA256.Create();
-		using var stream = File.OpenRead(path);
-		var hash = sha.ComputeHash(stream);
-		return Convert.ToHexString(hash).ToLowerInvariant();
-	}
-
 	private static string Quote(string value)
 	{
 		if (string.IsNullOrWhiteSpace(value))